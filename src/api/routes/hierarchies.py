@@ -2,7 +2,7 @@
 Hierarchies Routes - 层级团队管理路由
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from flasgger import swag_from
 from pydantic import ValidationError
 
@@ -18,9 +18,26 @@ from ...db.repositories.hierarchy_repo import check_agent_ids_unique_in_hierarch
 hierarchies_bp = Blueprint('hierarchies', __name__)
 
 
+# Swagger 公共片段（模块加载时构建一次，供各路由复用）
+_ID_SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {
+        'id': {'type': 'string', 'description': '层级团队唯一标识 (UUID)'}
+    }
+}
+
+
+def _body_param(schema: dict) -> list:
+    """构建 Swagger 请求体参数"""
+    return [{'name': 'body', 'in': 'body', 'required': True, 'schema': schema}]
+
+
 def get_repo():
-    """获取层级团队仓库"""
-    return HierarchyRepository(get_db_session())
+    """获取层级团队仓库（请求内复用，会话由 teardown_appcontext 统一清理）"""
+    if 'hier_repo' not in g:
+        g.hier_repo = HierarchyRepository(get_db_session())
+    return g.hier_repo
 
 
 @hierarchies_bp.route('/list', methods=['POST'])
@@ -28,19 +45,14 @@ def get_repo():
     'tags': ['Hierarchies'],
     'summary': '获取层级团队列表',
     'description': '分页获取层级团队配置列表，支持按激活状态筛选',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'properties': {
-                'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
-                'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
-                'is_active': {'type': 'boolean', 'description': '筛选激活状态，true=仅激活，false=仅未激活，不传=全部'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'properties': {
+            'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
+            'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
+            'is_active': {'type': 'boolean', 'description': '筛选激活状态，true=仅激活，false=仅未激活，不传=全部'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '层级团队列表',
@@ -84,32 +96,16 @@ def list_hierarchies():
     """获取层级团队列表"""
     try:
         data = request.get_json() or {}
-        req = HierarchyListRequest(**data)
+        req = HierarchyListRequest.model_validate(data)
 
         repo = get_repo()
-        hierarchies, total = repo.list(
+        # 列投影查询直接返回简化的列表项，无需构建 ORM 对象
+        content, total = repo.list_summary(
             page=req.page,
             size=req.size,
             is_active=req.is_active
         )
 
-        # 返回简化的列表项
-        content = []
-        for h in hierarchies:
-            config = h.config or {}
-            item = {
-                'id': h.id,
-                'name': h.name,
-                'description': h.description,
-                'execution_mode': config.get('execution_mode', 'sequential'),
-                'team_count': len(config.get('teams', [])),
-                'is_active': h.is_active,
-                'version': h.version,
-                'created_at': h.created_at.isoformat() if h.created_at else None,
-                'updated_at': h.updated_at.isoformat() if h.updated_at else None,
-            }
-            content.append(item)
-
         return jsonify(build_page_response(
             content=content,
             page=req.page,
@@ -127,18 +123,7 @@ def list_hierarchies():
     'tags': ['Hierarchies'],
     'summary': '获取层级团队详情',
     'description': '根据 ID 获取层级团队的完整配置信息，包括 Global Supervisor、Team Supervisors 和 Workers 的详细配置',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '层级团队唯一标识 (UUID)'}
-            }
-        }
-    }],
+    'parameters': _body_param(_ID_SCHEMA),
     'responses': {
         200: {
             'description': '层级团队详情',
@@ -169,7 +154,7 @@ def get_hierarchy():
     """获取层级团队详情"""
     try:
         data = request.get_json() or {}
-        req = IdRequest(**data)
+        req = IdRequest.model_validate(data)
 
         repo = get_repo()
         hierarchy = repo.get_by_id(req.id)
@@ -177,10 +162,16 @@ def get_hierarchy():
         if not hierarchy:
             return jsonify({'success': False, 'error': '层级团队不存在'}), 404
 
-        return jsonify({
-            'success': True,
-            'data': hierarchy.to_dict()
-        })
+        # 非 teams 部分在此处立即序列化，出错时仍走下方的 500 处理
+        chunks = hierarchy.iter_json_chunks()
+
+        def generate():
+            # 按团队分段输出，不在内存中构建完整的响应体
+            yield b'{"success":true,"data":'
+            yield from chunks
+            yield b'}'
+
+        return Response(stream_with_context(generate()), mimetype='application/json')
     except ValidationError as e:
         return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
@@ -224,54 +215,77 @@ Global Supervisor (全局协调者)
 }
 ```
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['name', 'global_supervisor_agent', 'teams'],
-            'properties': {
-                'name': {'type': 'string', 'description': '层级团队名称，必须唯一', 'example': 'customer-service-team'},
-                'description': {'type': 'string', 'description': '层级团队描述', 'example': '客服智能体团队'},
-                'execution_mode': {'type': 'string', 'enum': ['sequential', 'parallel'], 'default': 'sequential', 'description': '团队执行模式：sequential=顺序执行，parallel=并行执行'},
-                'enable_context_sharing': {'type': 'boolean', 'default': False, 'description': '是否启用跨团队上下文共享'},
-                'global_supervisor_agent': {
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['name', 'global_supervisor_agent', 'teams'],
+        'properties': {
+            'name': {'type': 'string', 'description': '层级团队名称，必须唯一', 'example': 'customer-service-team'},
+            'description': {'type': 'string', 'description': '层级团队描述', 'example': '客服智能体团队'},
+            'execution_mode': {'type': 'string', 'enum': ['sequential', 'parallel'], 'default': 'sequential', 'description': '团队执行模式：sequential=顺序执行，parallel=并行执行'},
+            'enable_context_sharing': {'type': 'boolean', 'default': False, 'description': '是否启用跨团队上下文共享'},
+            'global_supervisor_agent': {
+                'type': 'object',
+                'required': ['system_prompt'],
+                'description': 'Global Supervisor 配置 - 全局协调者，负责任务分解和团队调度',
+                'properties': {
+                    'agent_id': {'type': 'string', 'description': 'Agent 唯一标识，用于事件追踪', 'example': 'gs-001'},
+                    'system_prompt': {'type': 'string', 'description': '系统提示词，定义 Agent 角色和行为', 'example': 'You are a global coordinator...'},
+                    'user_message': {'type': 'string', 'description': '预定义的用户消息（可选）'},
+                    'llm_config': {
+                        'type': 'object',
+                        'description': 'LLM 配置参数',
+                        'properties': {
+                            'temperature': {'type': 'number', 'default': 0.7, 'description': '温度参数 (0.0-2.0)，越高越随机'},
+                            'max_tokens': {'type': 'integer', 'default': 2048, 'description': '最大输出 Token 数'},
+                            'top_p': {'type': 'number', 'default': 0.9, 'description': 'Top-P 采样参数'},
+                            'model_id': {'type': 'string', 'description': '关联的模型配置 ID（可选）'}
+                        }
+                    }
+                }
+            },
+            'teams': {
+                'type': 'array',
+                'description': '团队配置列表，至少包含一个团队',
+                'items': {
                     'type': 'object',
-                    'required': ['system_prompt'],
-                    'description': 'Global Supervisor 配置 - 全局协调者，负责任务分解和团队调度',
+                    'required': ['name', 'team_supervisor_agent', 'workers'],
                     'properties': {
-                        'agent_id': {'type': 'string', 'description': 'Agent 唯一标识，用于事件追踪', 'example': 'gs-001'},
-                        'system_prompt': {'type': 'string', 'description': '系统提示词，定义 Agent 角色和行为', 'example': 'You are a global coordinator...'},
-                        'user_message': {'type': 'string', 'description': '预定义的用户消息（可选）'},
-                        'llm_config': {
+                        'name': {'type': 'string', 'description': '团队名称，在层级内唯一', 'example': 'analysis-team'},
+                        'team_supervisor_agent': {
                             'type': 'object',
-                            'description': 'LLM 配置参数',
+                            'required': ['system_prompt'],
+                            'description': 'Team Supervisor 配置 - 团队主管，负责协调本团队的 Workers',
                             'properties': {
-                                'temperature': {'type': 'number', 'default': 0.7, 'description': '温度参数 (0.0-2.0)，越高越随机'},
-                                'max_tokens': {'type': 'integer', 'default': 2048, 'description': '最大输出 Token 数'},
-                                'top_p': {'type': 'number', 'default': 0.9, 'description': 'Top-P 采样参数'},
-                                'model_id': {'type': 'string', 'description': '关联的模型配置 ID（可选）'}
+                                'agent_id': {'type': 'string', 'description': 'Agent 唯一标识', 'example': 'ts-001'},
+                                'system_prompt': {'type': 'string', 'description': '系统提示词'},
+                                'user_message': {'type': 'string', 'description': '预定义的用户消息（可选）'},
+                                'llm_config': {
+                                    'type': 'object',
+                                    'description': 'LLM 配置参数',
+                                    'properties': {
+                                        'temperature': {'type': 'number', 'default': 0.7},
+                                        'max_tokens': {'type': 'integer', 'default': 2048},
+                                        'top_p': {'type': 'number', 'default': 0.9},
+                                        'model_id': {'type': 'string'}
+                                    }
+                                }
                             }
-                        }
-                    }
-                },
-                'teams': {
-                    'type': 'array',
-                    'description': '团队配置列表，至少包含一个团队',
-                    'items': {
-                        'type': 'object',
-                        'required': ['name', 'team_supervisor_agent', 'workers'],
-                        'properties': {
-                            'name': {'type': 'string', 'description': '团队名称，在层级内唯一', 'example': 'analysis-team'},
-                            'team_supervisor_agent': {
+                        },
+                        'prevent_duplicate': {'type': 'boolean', 'default': True, 'description': '是否防止重复调用同一任务'},
+                        'share_context': {'type': 'boolean', 'default': False, 'description': '是否接收其他团队的执行上下文'},
+                        'workers': {
+                            'type': 'array',
+                            'description': 'Worker 配置列表，至少包含一个 Worker',
+                            'items': {
                                 'type': 'object',
-                                'required': ['system_prompt'],
-                                'description': 'Team Supervisor 配置 - 团队主管，负责协调本团队的 Workers',
+                                'required': ['name', 'role', 'system_prompt'],
                                 'properties': {
-                                    'agent_id': {'type': 'string', 'description': 'Agent 唯一标识', 'example': 'ts-001'},
-                                    'system_prompt': {'type': 'string', 'description': '系统提示词'},
+                                    'agent_id': {'type': 'string', 'description': 'Agent 唯一标识', 'example': 'w-001'},
+                                    'name': {'type': 'string', 'description': 'Worker 名称', 'example': 'Data Analyst'},
+                                    'role': {'type': 'string', 'description': 'Worker 角色描述', 'example': '数据分析专家'},
+                                    'system_prompt': {'type': 'string', 'description': '系统提示词，定义 Worker 的专业能力'},
                                     'user_message': {'type': 'string', 'description': '预定义的用户消息（可选）'},
+                                    'tools': {'type': 'array', 'items': {'type': 'string'}, 'description': '可用工具列表', 'example': ['calculator', 'http_request']},
                                     'llm_config': {
                                         'type': 'object',
                                         'description': 'LLM 配置参数',
@@ -283,41 +297,13 @@ Global Supervisor (全局协调者)
                                         }
                                     }
                                 }
-                            },
-                            'prevent_duplicate': {'type': 'boolean', 'default': True, 'description': '是否防止重复调用同一任务'},
-                            'share_context': {'type': 'boolean', 'default': False, 'description': '是否接收其他团队的执行上下文'},
-                            'workers': {
-                                'type': 'array',
-                                'description': 'Worker 配置列表，至少包含一个 Worker',
-                                'items': {
-                                    'type': 'object',
-                                    'required': ['name', 'role', 'system_prompt'],
-                                    'properties': {
-                                        'agent_id': {'type': 'string', 'description': 'Agent 唯一标识', 'example': 'w-001'},
-                                        'name': {'type': 'string', 'description': 'Worker 名称', 'example': 'Data Analyst'},
-                                        'role': {'type': 'string', 'description': 'Worker 角色描述', 'example': '数据分析专家'},
-                                        'system_prompt': {'type': 'string', 'description': '系统提示词，定义 Worker 的专业能力'},
-                                        'user_message': {'type': 'string', 'description': '预定义的用户消息（可选）'},
-                                        'tools': {'type': 'array', 'items': {'type': 'string'}, 'description': '可用工具列表', 'example': ['calculator', 'http_request']},
-                                        'llm_config': {
-                                            'type': 'object',
-                                            'description': 'LLM 配置参数',
-                                            'properties': {
-                                                'temperature': {'type': 'number', 'default': 0.7},
-                                                'max_tokens': {'type': 'integer', 'default': 2048},
-                                                'top_p': {'type': 'number', 'default': 0.9},
-                                                'model_id': {'type': 'string'}
-                                            }
-                                        }
-                                    }
-                                }
                             }
                         }
                     }
                 }
             }
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '创建成功',
@@ -353,21 +339,14 @@ def create_hierarchy():
         print(f"\n[hierarchies/create] 收到请求参数:", flush=True)
         print(json.dumps(data, indent=2, ensure_ascii=False), flush=True)
 
-        req = HierarchyCreateRequest(**data)
+        req = HierarchyCreateRequest.model_validate(data)
 
         repo = get_repo()
 
-        # 检查名称是否重复
-        if repo.get_by_name(req.name):
-            return jsonify({'success': False, 'error': f'层级团队名称 "{req.name}" 已存在'}), 400
-
-        # 构建 config JSON
-        config = {
-            'execution_mode': req.execution_mode,
-            'enable_context_sharing': req.enable_context_sharing,
-            'global_supervisor_agent': req.global_supervisor_agent.model_dump(),
-            'teams': [team.model_dump() for team in req.teams]
-        }
+        # 构建 config JSON（一次 model_dump 生成全部嵌套字典）
+        config = req.model_dump(include={
+            'execution_mode', 'enable_context_sharing', 'global_supervisor_agent', 'teams'
+        })
 
         # 验证 agent_id 唯一性
         is_unique, duplicate_id = check_agent_ids_unique_in_hierarchy(config)
@@ -378,12 +357,14 @@ def create_hierarchy():
                 'code': 400001
             }), 400
 
-        # 创建 Hierarchy
-        hierarchy = repo.create(
+        # 创建 Hierarchy（名称重复由数据库唯一约束检测）
+        hierarchy, created = repo.create_if_unique_name(
             name=req.name,
             description=req.description,
             config=config
         )
+        if not created:
+            return jsonify({'success': False, 'error': f'层级团队名称 "{req.name}" 已存在'}), 400
 
         return jsonify({
             'success': True,
@@ -431,25 +412,20 @@ def create_hierarchy():
 
 更新 `global_supervisor_agent` 或 `teams` 时，会重新验证所有 `agent_id` 的唯一性。
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '层级团队唯一标识 (UUID)'},
-                'name': {'type': 'string', 'description': '新的层级团队名称'},
-                'description': {'type': 'string', 'description': '新的描述信息'},
-                'execution_mode': {'type': 'string', 'enum': ['sequential', 'parallel'], 'description': '团队执行模式'},
-                'enable_context_sharing': {'type': 'boolean', 'description': '是否启用跨团队上下文共享'},
-                'global_supervisor_agent': {'type': 'object', 'description': '完整的 Global Supervisor 配置（完整替换）'},
-                'teams': {'type': 'array', 'description': '完整的团队配置列表（完整替换）'},
-                'is_active': {'type': 'boolean', 'description': '是否激活，false=停用'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'id': {'type': 'string', 'description': '层级团队唯一标识 (UUID)'},
+            'name': {'type': 'string', 'description': '新的层级团队名称'},
+            'description': {'type': 'string', 'description': '新的描述信息'},
+            'execution_mode': {'type': 'string', 'enum': ['sequential', 'parallel'], 'description': '团队执行模式'},
+            'enable_context_sharing': {'type': 'boolean', 'description': '是否启用跨团队上下文共享'},
+            'global_supervisor_agent': {'type': 'object', 'description': '完整的 Global Supervisor 配置（完整替换）'},
+            'teams': {'type': 'array', 'description': '完整的团队配置列表（完整替换）'},
+            'is_active': {'type': 'boolean', 'description': '是否激活，false=停用'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '更新成功',
@@ -470,24 +446,12 @@ def update_hierarchy():
     """更新层级团队"""
     try:
         data = request.get_json() or {}
-        req = HierarchyUpdateRequest(**data)
+        req = HierarchyUpdateRequest.model_validate(data)
 
         repo = get_repo()
 
-        # 检查名称是否与其他层级重复
-        if req.name:
-            existing = repo.get_by_name(req.name)
-            if existing and existing.id != req.id:
-                return jsonify({'success': False, 'error': f'层级团队名称 "{req.name}" 已存在'}), 400
-
         # 构建更新数据
-        update_data = {}
-        if req.name:
-            update_data['name'] = req.name
-        if req.description is not None:
-            update_data['description'] = req.description
-        if req.is_active is not None:
-            update_data['is_active'] = req.is_active
+        update_data = req.model_dump(include={'name', 'description', 'is_active'}, exclude_none=True)
 
         # 如果有配置更新，构建新的 config
         if req.global_supervisor_agent or req.teams or req.execution_mode or req.enable_context_sharing is not None:
@@ -518,7 +482,14 @@ def update_hierarchy():
 
             update_data['config'] = config
 
-        hierarchy = repo.update(req.id, update_data)
+        if not update_data:
+            # 没有需要更新的字段，直接返回当前数据（不执行 UPDATE，版本号不变）
+            hierarchy = repo.get_by_id(req.id)
+        else:
+            # 名称与其他层级重复由数据库唯一约束检测
+            hierarchy, name_ok = repo.update_if_unique_name(req.id, update_data)
+            if not name_ok:
+                return jsonify({'success': False, 'error': f'层级团队名称 "{req.name}" 已存在'}), 400
 
         if not hierarchy:
             return jsonify({'success': False, 'error': '层级团队不存在'}), 404
@@ -542,18 +513,7 @@ def update_hierarchy():
 
 **注意**: 此操作不可逆，删除后无法恢复。建议在删除前先将 `is_active` 设为 `false` 进行停用。
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '层级团队唯一标识 (UUID)'}
-            }
-        }
-    }],
+    'parameters': _body_param(_ID_SCHEMA),
     'responses': {
         200: {
             'description': '删除成功',
@@ -572,7 +532,7 @@ def delete_hierarchy():
     """删除层级团队"""
     try:
         data = request.get_json() or {}
-        req = IdRequest(**data)
+        req = IdRequest.model_validate(data)
 
         repo = get_repo()
         success = repo.delete(req.id)
@@ -2,7 +2,7 @@
 Models Routes - AI 模型管理路由
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flasgger import swag_from
 from pydantic import ValidationError
 
@@ -16,9 +16,26 @@ from ...db.repositories import ModelRepository
 models_bp = Blueprint('models', __name__)
 
 
+# Swagger 公共片段（模块加载时构建一次，供各路由复用）
+_ID_SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {
+        'id': {'type': 'string', 'description': '模型唯一标识 (UUID)'}
+    }
+}
+
+
+def _body_param(schema: dict) -> list:
+    """构建 Swagger 请求体参数"""
+    return [{'name': 'body', 'in': 'body', 'required': True, 'schema': schema}]
+
+
 def get_repo():
-    """获取模型仓库"""
-    return ModelRepository(get_db_session())
+    """获取模型仓库（请求内复用，会话由 teardown_appcontext 统一清理）"""
+    if 'model_repo' not in g:
+        g.model_repo = ModelRepository(get_db_session())
+    return g.model_repo
 
 
 @models_bp.route('/list', methods=['POST'])
@@ -29,19 +46,14 @@ def get_repo():
 
 模型配置用于定义 Agent 使用的底层 LLM 参数，包括 AWS Bedrock 模型 ID、区域、温度、最大 Token 数等。
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'properties': {
-                'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
-                'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
-                'is_active': {'type': 'boolean', 'description': '按激活状态筛选，true=已激活，false=已禁用，不传=全部'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'properties': {
+            'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
+            'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
+            'is_active': {'type': 'boolean', 'description': '按激活状态筛选，true=已激活，false=已禁用，不传=全部'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '模型列表',
@@ -85,17 +97,17 @@ def list_models():
     """获取模型列表"""
     try:
         data = request.get_json() or {}
-        req = ModelListRequest(**data)
+        req = ModelListRequest.model_validate(data)
 
         repo = get_repo()
-        models, total = repo.list(
+        content, total = repo.list_summary(
             page=req.page,
             size=req.size,
             is_active=req.is_active
         )
 
         return jsonify(build_page_response(
-            content=[m.to_dict() for m in models],
+            content=content,
             page=req.page,
             size=req.size,
             total=total
@@ -111,18 +123,7 @@ def list_models():
     'tags': ['Models'],
     'summary': '获取模型详情',
     'description': '根据模型 ID 获取模型的详细配置信息，包括 AWS Bedrock 参数和激活状态。',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '模型唯一标识 (UUID)'}
-            }
-        }
-    }],
+    'parameters': _body_param(_ID_SCHEMA),
     'responses': {
         200: {
             'description': '模型详情',
@@ -165,7 +166,7 @@ def get_model():
     """获取模型详情"""
     try:
         data = request.get_json() or {}
-        req = IdRequest(**data)
+        req = IdRequest.model_validate(data)
 
         repo = get_repo()
         model = repo.get_by_id(req.id)
@@ -204,25 +205,20 @@ def get_model():
 - Claude 3 Sonnet: `anthropic.claude-3-sonnet-20240229-v1:0`
 - Claude 3 Haiku: `anthropic.claude-3-haiku-20240307-v1:0`
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['name', 'model_id'],
-            'properties': {
-                'name': {'type': 'string', 'description': '模型名称，用于在层级配置中引用，必须唯一'},
-                'model_id': {'type': 'string', 'description': 'AWS Bedrock 模型 ID'},
-                'region': {'type': 'string', 'default': 'us-east-1', 'description': 'AWS 区域，默认 us-east-1'},
-                'temperature': {'type': 'number', 'default': 0.7, 'description': '温度参数 (0-1)，默认 0.7'},
-                'max_tokens': {'type': 'integer', 'default': 2048, 'description': '最大 Token 数，默认 2048'},
-                'top_p': {'type': 'number', 'default': 0.9, 'description': 'Top-P 参数 (0-1)，默认 0.9'},
-                'description': {'type': 'string', 'description': '模型描述（可选）'},
-                'is_active': {'type': 'boolean', 'default': True, 'description': '是否激活，默认 true'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['name', 'model_id'],
+        'properties': {
+            'name': {'type': 'string', 'description': '模型名称，用于在层级配置中引用，必须唯一'},
+            'model_id': {'type': 'string', 'description': 'AWS Bedrock 模型 ID'},
+            'region': {'type': 'string', 'default': 'us-east-1', 'description': 'AWS 区域，默认 us-east-1'},
+            'temperature': {'type': 'number', 'default': 0.7, 'description': '温度参数 (0-1)，默认 0.7'},
+            'max_tokens': {'type': 'integer', 'default': 2048, 'description': '最大 Token 数，默认 2048'},
+            'top_p': {'type': 'number', 'default': 0.9, 'description': 'Top-P 参数 (0-1)，默认 0.9'},
+            'description': {'type': 'string', 'description': '模型描述（可选）'},
+            'is_active': {'type': 'boolean', 'default': True, 'description': '是否激活，默认 true'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '创建成功',
@@ -263,16 +259,15 @@ def create_model():
     """创建模型"""
     try:
         data = request.get_json() or {}
-        req = ModelCreateRequest(**data)
+        req = ModelCreateRequest.model_validate(data)
 
         repo = get_repo()
 
-        # 检查名称是否重复
-        if repo.get_by_name(req.name):
+        # 名称重复由数据库唯一约束检测
+        model, created = repo.create_if_unique_name(req.model_dump())
+        if not created:
             return jsonify({'success': False, 'error': f'模型名称 "{req.name}" 已存在'}), 400
 
-        model = repo.create(req.model_dump())
-
         return jsonify({
             'success': True,
             'message': '模型创建成功',
@@ -292,26 +287,21 @@ def create_model():
 
 只需传入需要更新的字段，未传入的字段保持原值不变。
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '模型唯一标识 (UUID)，必填'},
-                'name': {'type': 'string', 'description': '模型名称，必须唯一'},
-                'model_id': {'type': 'string', 'description': 'AWS Bedrock 模型 ID'},
-                'region': {'type': 'string', 'description': 'AWS 区域'},
-                'temperature': {'type': 'number', 'description': '温度参数 (0-1)'},
-                'max_tokens': {'type': 'integer', 'description': '最大 Token 数'},
-                'top_p': {'type': 'number', 'description': 'Top-P 参数 (0-1)'},
-                'description': {'type': 'string', 'description': '模型描述'},
-                'is_active': {'type': 'boolean', 'description': '是否激活'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'id': {'type': 'string', 'description': '模型唯一标识 (UUID)，必填'},
+            'name': {'type': 'string', 'description': '模型名称，必须唯一'},
+            'model_id': {'type': 'string', 'description': 'AWS Bedrock 模型 ID'},
+            'region': {'type': 'string', 'description': 'AWS 区域'},
+            'temperature': {'type': 'number', 'description': '温度参数 (0-1)'},
+            'max_tokens': {'type': 'integer', 'description': '最大 Token 数'},
+            'top_p': {'type': 'number', 'description': 'Top-P 参数 (0-1)'},
+            'description': {'type': 'string', 'description': '模型描述'},
+            'is_active': {'type': 'boolean', 'description': '是否激活'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '更新成功',
@@ -350,21 +340,22 @@ def update_model():
     """更新模型"""
     try:
         data = request.get_json() or {}
-        req = ModelUpdateRequest(**data)
+        req = ModelUpdateRequest.model_validate(data)
 
         repo = get_repo()
 
         # 过滤掉 None 值
-        update_data = {k: v for k, v in req.model_dump().items() if v is not None and k != 'id'}
-
-        # 检查名称是否与其他模型重复
-        if 'name' in update_data:
-            existing = repo.get_by_name(update_data['name'])
-            if existing and existing.id != req.id:
+        update_data = req.model_dump(exclude_none=True, exclude={'id'})
+
+        if not update_data:
+            # 没有需要更新的字段，直接返回当前数据（不执行 UPDATE）
+            model = repo.get_by_id(req.id)
+        else:
+            # 名称与其他模型重复由数据库唯一约束检测
+            model, name_ok = repo.update_if_unique_name(req.id, update_data)
+            if not name_ok:
                 return jsonify({'success': False, 'error': f'模型名称 "{update_data["name"]}" 已存在'}), 400
 
-        model = repo.update(req.id, update_data)
-
         if not model:
             return jsonify({'success': False, 'error': '模型不存在'}), 404
 
@@ -387,18 +378,7 @@ def update_model():
 
 **注意**: 删除模型后，引用该模型的层级配置可能无法正常执行。建议先检查模型是否被使用。
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'string', 'description': '模型唯一标识 (UUID)'}
-            }
-        }
-    }],
+    'parameters': _body_param(_ID_SCHEMA),
     'responses': {
         200: {
             'description': '删除成功',
@@ -426,7 +406,7 @@ def delete_model():
     """删除模型"""
     try:
         data = request.get_json() or {}
-        req = IdRequest(**data)
+        req = IdRequest.model_validate(data)
 
         repo = get_repo()
         success = repo.delete(req.id)
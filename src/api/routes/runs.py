@@ -20,6 +20,21 @@ from ...streaming.event_store import get_event_store
 runs_bp = Blueprint('runs', __name__)
 
 
+# Swagger 公共片段（模块加载时构建一次，供各路由复用）
+_ID_SCHEMA = {
+    'type': 'object',
+    'required': ['id'],
+    'properties': {
+        'id': {'type': 'integer', 'description': '运行 ID'}
+    }
+}
+
+
+def _body_param(schema: dict) -> list:
+    """构建 Swagger 请求体参数"""
+    return [{'name': 'body', 'in': 'body', 'required': True, 'schema': schema}]
+
+
 def get_repo():
     """获取运行记录仓库"""
     # 确保使用新的会话，能看到其他线程提交的数据
@@ -39,19 +54,14 @@ def get_run_manager():
     'tags': ['Runs'],
     'summary': '启动运行',
     'description': '启动新的层级团队执行任务，返回运行 ID 和流式 URL',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['hierarchy_id', 'task'],
-            'properties': {
-                'hierarchy_id': {'type': 'string', 'description': '层级团队 ID'},
-                'task': {'type': 'string', 'description': '任务描述'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['hierarchy_id', 'task'],
+        'properties': {
+            'hierarchy_id': {'type': 'string', 'description': '层级团队 ID'},
+            'task': {'type': 'string', 'description': '任务描述'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '启动成功',
@@ -110,20 +120,15 @@ def start_run():
     'tags': ['Runs'],
     'summary': '获取运行列表',
     'description': '分页获取任务运行记录列表，支持按层级团队和状态筛选',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'properties': {
-                'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
-                'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
-                'hierarchy_id': {'type': 'string', 'description': '按层级团队 ID 筛选'},
-                'status': {'type': 'string', 'enum': ['pending', 'running', 'completed', 'failed', 'cancelled'], 'description': '按运行状态筛选'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'properties': {
+            'page': {'type': 'integer', 'default': 1, 'description': '页码，从 1 开始'},
+            'size': {'type': 'integer', 'default': 20, 'description': '每页数量，范围 1-100'},
+            'hierarchy_id': {'type': 'string', 'description': '按层级团队 ID 筛选'},
+            'status': {'type': 'string', 'enum': ['pending', 'running', 'completed', 'failed', 'cancelled'], 'description': '按运行状态筛选'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '运行列表',
@@ -194,18 +199,13 @@ def list_runs():
     'tags': ['Runs'],
     'summary': '获取运行详情',
     'description': '根据运行 ID 获取运行的详细信息，包括任务描述、状态、结果和执行统计',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'integer', 'description': '运行唯一标识'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'id': {'type': 'integer', 'description': '运行唯一标识'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '运行详情',
@@ -330,18 +330,7 @@ data: {"run_id": "...", "timestamp": "...", "sequence": 123, "source": {...}, "e
 }
 ```
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'integer', 'description': '运行 ID'}
-            }
-        }
-    }],
+    'parameters': _body_param(_ID_SCHEMA),
     'responses': {
         200: {
             'description': 'SSE 事件流 (text/event-stream)',
@@ -433,18 +422,13 @@ def stream_run():
 - 已完成 (`completed`)、已失败 (`failed`)、已取消 (`cancelled`) 的运行无法再次取消
 - 取消操作是异步的，Agent 可能需要一定时间才能完全停止
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'integer', 'description': '要取消的运行 ID'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'id': {'type': 'integer', 'description': '要取消的运行 ID'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '取消成功',
@@ -550,21 +534,16 @@ def cancel_run():
 - 事件数据保留 24 小时
 - 超过 24 小时的运行可能返回空事件列表
 ''',
-    'parameters': [{
-        'name': 'body',
-        'in': 'body',
-        'required': True,
-        'schema': {
-            'type': 'object',
-            'required': ['id'],
-            'properties': {
-                'id': {'type': 'integer', 'description': '运行 ID'},
-                'start_id': {'type': 'string', 'default': '-', 'description': '起始 ID，"-" 表示最早'},
-                'end_id': {'type': 'string', 'default': '+', 'description': '结束 ID，"+" 表示最新'},
-                'limit': {'type': 'integer', 'default': 1000, 'description': '最大返回数量 (1-10000)'}
-            }
+    'parameters': _body_param({
+        'type': 'object',
+        'required': ['id'],
+        'properties': {
+            'id': {'type': 'integer', 'description': '运行 ID'},
+            'start_id': {'type': 'string', 'default': '-', 'description': '起始 ID，"-" 表示最早'},
+            'end_id': {'type': 'string', 'default': '+', 'description': '结束 ID，"+" 表示最新'},
+            'limit': {'type': 'integer', 'default': 1000, 'description': '最大返回数量 (1-10000)'}
         }
-    }],
+    }),
     'responses': {
         200: {
             'description': '事件列表',
@@ -59,8 +59,8 @@ def build_page_response(content: list, page: int, size: int, total: int) -> dict
     Returns:
         符合宪法的分页响应字典
     """
-    import math
-    total_pages = math.ceil(total / size) if size > 0 else 0
+    # 整数向上取整，无需浮点除法和 math.ceil
+    total_pages = (total + size - 1) // size if size > 0 else 0
     return {
         'code': 0,
         'message': 'success',
@@ -2,7 +2,7 @@
 Hierarchy Schemas - 层级团队请求/响应模型
 """
 
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 
 from .common import PaginationRequest, LLMConfig
@@ -45,7 +45,7 @@ class HierarchyCreateRequest(BaseModel):
     """创建层级团队请求"""
     name: str = Field(..., min_length=1, max_length=100, description="层级团队名称")
     description: Optional[str] = Field(default=None, description="描述")
-    execution_mode: str = Field(default="sequential", pattern="^(sequential|parallel)$", description="执行模式")
+    execution_mode: Literal['sequential', 'parallel'] = Field(default="sequential", description="执行模式")
     enable_context_sharing: bool = Field(default=False, description="启用上下文共享")
     global_supervisor_agent: AgentConfig = Field(..., description="Global Supervisor Agent 配置")
     teams: List[TeamConfig] = Field(..., min_length=1, description="团队列表")
@@ -56,7 +56,7 @@ class HierarchyUpdateRequest(BaseModel):
     id: str = Field(..., description="层级团队 ID")
     name: Optional[str] = Field(default=None, min_length=1, max_length=100)
     description: Optional[str] = None
-    execution_mode: Optional[str] = Field(default=None, pattern="^(sequential|parallel)$")
+    execution_mode: Optional[Literal['sequential', 'parallel']] = None
     enable_context_sharing: Optional[bool] = None
     global_supervisor_agent: Optional[AgentConfig] = Field(default=None, description="Global Supervisor Agent 配置")
     teams: Optional[List[TeamConfig]] = Field(default=None, description="完整替换团队配置")
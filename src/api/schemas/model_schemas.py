@@ -3,7 +3,7 @@ Model Schemas - AI 模型请求/响应模型
 """
 
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import PaginationRequest
 
@@ -52,5 +52,4 @@ class ModelResponse(BaseModel):
     created_at: Optional[str]
     updated_at: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
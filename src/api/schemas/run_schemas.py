@@ -3,7 +3,7 @@ Run Schemas - 运行记录请求/响应模型
 """
 
 from typing import Optional, List, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import PaginationRequest
 
@@ -39,8 +39,7 @@ class EventResponse(BaseModel):
     team_name: Optional[str]
     worker_name: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RunResponse(BaseModel):
@@ -56,8 +55,7 @@ class RunResponse(BaseModel):
     completed_at: Optional[str]
     created_at: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RunDetailResponse(RunResponse):
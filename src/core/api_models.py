@@ -65,7 +65,7 @@ class EventAction(str, Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class EventSource:
     """事件来源"""
     agent_id: str
@@ -112,7 +112,7 @@ class EventSource:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class EventMeta:
     """事件元信息"""
     category: EventCategory
@@ -125,7 +125,7 @@ class EventMeta:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """
     流式事件结构 - 用于 SSE 实时流
@@ -157,7 +157,7 @@ class StreamEvent:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class InternalEvent:
     """
     内部事件结构 - 用于执行跟踪器
@@ -12,59 +12,171 @@
 3. IAM Role 认证（最低优先级）- 适用于 AWS 部署场景（EC2/Lambda）
 """
 
+import functools
 import os
-from typing import Optional
+import re
+from collections import ChainMap
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
 
 
+DEFAULT_MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+DEFAULT_AWS_REGION = "us-east-1"
+
+
+# .env 单行匹配：KEY=value / KEY="value" / KEY='value'，支持行尾 " # 注释"
+_DOTENV_LINE_RE = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))"""
+    r"""(?:[ \t]+#[^\n]*)?[ \t\r]*$""",
+    re.MULTILINE
+)
+
+# Config 关心的 .env 键，其余键在解析阶段直接丢弃
+_DOTENV_KEYS = frozenset((
+    'AWS_BEDROCK_API_KEY',
+    'AWS_ACCESS_KEY_ID',
+    'AWS_SECRET_ACCESS_KEY',
+    'AWS_BEDROCK_MODEL_ID',
+    'AWS_REGION',
+    'AWS_DEFAULT_REGION',
+    'USE_IAM_ROLE',
+))
+
+# .env 键 -> 配置字段名（USE_IAM_ROLE 需要转换为布尔值，单独处理）
+_DOTENV_FIELDS = {
+    'AWS_BEDROCK_API_KEY': 'api_key',
+    'AWS_ACCESS_KEY_ID': 'access_key_id',
+    'AWS_SECRET_ACCESS_KEY': 'secret_access_key',
+    'AWS_BEDROCK_MODEL_ID': 'model_id',
+    'AWS_REGION': 'aws_region',
+    'AWS_DEFAULT_REGION': 'aws_region',
+}
+
+# .env 解析结果缓存：(绝对路径, mtime_ns, size) -> {key: value}
+# 文件未变化时重复调用 load_from_dotenv 只需一次 stat + 字典查找
+_DOTENV_CACHE: Dict[Tuple[str, int, int], Dict[str, str]] = {}
+
+# 环境变量缓存的"未读取"哨兵（区别于变量不存在时缓存的 None）
+_MISSING = object()
+
+
+def _is_truthy(value: Optional[str]) -> bool:
+    """判断字符串配置值是否表示 True"""
+    return (value or '').lower() in ('true', '1', 'yes')
+
+
+def _parse_dotenv(env_file: Path) -> Dict[str, str]:
+    """
+    解析 .env 文件（带缓存）
+
+    Args:
+        env_file: .env 文件路径
+
+    Returns:
+        Config 关心的键值对字典（同名键以最后一次出现为准）
+    """
+    st = env_file.stat()
+    cache_key = (str(env_file.resolve()), st.st_mtime_ns, st.st_size)
+    cached = _DOTENV_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # 单次正则扫描整个文件，替代逐行 strip/split
+    values = {
+        key: dq or sq or raw
+        for key, dq, sq, raw in _DOTENV_LINE_RE.findall(env_file.read_text())
+        if key in _DOTENV_KEYS
+    }
+
+    _DOTENV_CACHE[cache_key] = values
+    return values
+
+
 class Config:
-    """配置管理类 - 单例模式"""
-    
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-    
+    """配置管理类 - 通过 get_config() 获取全局唯一实例"""
+
+    __slots__ = (
+        '_override', '_env', '_dotenv', '_default', '_view',
+        '_env_cache', '_fully_loaded',
+    )
+
     # 服务器配置常量（NON-NEGOTIABLE，禁止通过环境变量修改）
     SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int = 8082  # 开发环境固定端口，禁止修改
     DEBUG_MODE: bool = False
 
     def __init__(self):
-        if not self._initialized:
-            self._aws_bedrock_api_key: Optional[str] = None
-            self._aws_access_key_id: Optional[str] = None
-            self._aws_secret_access_key: Optional[str] = None
-            self._model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0"
-            self._aws_region: str = "us-east-1"
-            self._use_iam_role: bool = False  # 是否使用 IAM Role 认证
-            self._initialized = True
+        # 分层配置：覆盖值 > 环境变量 > .env 文件 > 默认值
+        # 各 load_from_* 只写入自己的层，读取时按 ChainMap 顺序查找
+        self._override: Dict[str, Any] = {}
+        self._env: Dict[str, Any] = {}
+        self._dotenv: Dict[str, Any] = {}
+        self._default: Dict[str, Any] = {
+            'model_id': DEFAULT_MODEL_ID,
+            'aws_region': DEFAULT_AWS_REGION,
+            'use_iam_role': False,  # 是否使用 IAM Role 认证
+        }
+        self._view = ChainMap(self._override, self._env, self._dotenv, self._default)
+        self._env_cache: Dict[str, Optional[str]] = {}  # 环境变量读取缓存
+        self._fully_loaded: bool = False  # 是否已完成一次完整加载
+
+    @classmethod
+    def reset(cls) -> None:
+        """重置全局配置实例（仅用于测试）"""
+        get_config.cache_clear()
+
+    def _getenv(self, key: str) -> Optional[str]:
+        """读取环境变量（首次读取后缓存）"""
+        value = self._env_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._env_cache[key] = os.environ.get(key)
+        return value
+
+    def _setenv(self, key: str, value: str) -> None:
+        """写入环境变量（值未变化时跳过写入），同步更新缓存"""
+        if os.environ.get(key) != value:
+            os.environ[key] = value
+        self._env_cache[key] = value
+
+    def _unsetenv(self, key: str) -> None:
+        """删除环境变量，同步更新缓存"""
+        os.environ.pop(key, None)
+        self._env_cache[key] = None
     
     def load_from_env(self) -> 'Config':
         """从环境变量加载配置"""
-        self._aws_bedrock_api_key = os.environ.get('AWS_BEDROCK_API_KEY')
+        # 缓存只在单次加载内去重，每次加载都重新读取环境变量
+        self._env_cache.clear()
+        env = {}
 
-        # 加载 AK/SK 认证信息
-        self._aws_access_key_id = os.environ.get('AWS_ACCESS_KEY_ID')
-        self._aws_secret_access_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
+        api_key = self._getenv('AWS_BEDROCK_API_KEY')
+        if api_key is not None:
+            env['api_key'] = api_key
 
-        model_id = os.environ.get('AWS_BEDROCK_MODEL_ID')
+        # 加载 AK/SK 认证信息
+        access_key_id = self._getenv('AWS_ACCESS_KEY_ID')
+        if access_key_id is not None:
+            env['access_key_id'] = access_key_id
+        secret_access_key = self._getenv('AWS_SECRET_ACCESS_KEY')
+        if secret_access_key is not None:
+            env['secret_access_key'] = secret_access_key
+
+        model_id = self._getenv('AWS_BEDROCK_MODEL_ID')
         if model_id:
-            self._model_id = model_id
+            env['model_id'] = model_id
 
         # 加载 AWS Region 配置
-        aws_region = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
+        aws_region = self._getenv('AWS_REGION') or self._getenv('AWS_DEFAULT_REGION')
         if aws_region:
-            self._aws_region = aws_region
+            env['aws_region'] = aws_region
 
         # 检查是否应使用 IAM Role 认证
-        use_iam = os.environ.get('USE_IAM_ROLE', '').lower() in ('true', '1', 'yes')
-        if use_iam:
-            self._use_iam_role = True
+        if _is_truthy(self._getenv('USE_IAM_ROLE')):
+            env['use_iam_role'] = True
 
+        self._env.clear()
+        self._env.update(env)
         return self
     
     def load_from_dotenv(self, dotenv_path: str = '.env') -> 'Config':
@@ -73,89 +185,79 @@ class Config:
         if not env_file.exists():
             return self
 
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-
-                    if key == 'AWS_BEDROCK_API_KEY':
-                        self._aws_bedrock_api_key = value
-                    elif key == 'AWS_ACCESS_KEY_ID':
-                        self._aws_access_key_id = value
-                    elif key == 'AWS_SECRET_ACCESS_KEY':
-                        self._aws_secret_access_key = value
-                    elif key == 'AWS_BEDROCK_MODEL_ID':
-                        self._model_id = value
-                    elif key in ('AWS_REGION', 'AWS_DEFAULT_REGION'):
-                        self._aws_region = value
-                    elif key == 'USE_IAM_ROLE':
-                        self._use_iam_role = value.lower() in ('true', '1', 'yes')
+        dotenv = {}
+        for key, value in _parse_dotenv(env_file).items():
+            if key == 'USE_IAM_ROLE':
+                dotenv['use_iam_role'] = _is_truthy(value)
+            else:
+                dotenv[_DOTENV_FIELDS[key]] = value
 
+        self._dotenv.clear()
+        self._dotenv.update(dotenv)
         return self
     
     def set_api_key(self, api_key: str) -> 'Config':
         """手动设置 API Key"""
-        self._aws_bedrock_api_key = api_key
+        self._override['api_key'] = api_key
+        self._env_cache.pop('AWS_BEDROCK_API_KEY', None)
         return self
     
     def set_model_id(self, model_id: str) -> 'Config':
         """手动设置模型 ID"""
-        self._model_id = model_id
+        self._override['model_id'] = model_id
+        self._env_cache.pop('AWS_BEDROCK_MODEL_ID', None)
         return self
     
     def set_aws_region(self, region: str) -> 'Config':
         """手动设置 AWS Region"""
-        self._aws_region = region
+        self._override['aws_region'] = region
         return self
     
     def set_use_iam_role(self, use_iam: bool) -> 'Config':
         """手动设置是否使用 IAM Role 认证"""
-        self._use_iam_role = use_iam
+        self._override['use_iam_role'] = use_iam
         return self
 
     def set_aws_credentials(self, access_key_id: str, secret_access_key: str) -> 'Config':
         """手动设置 AWS AK/SK 凭证"""
-        self._aws_access_key_id = access_key_id
-        self._aws_secret_access_key = secret_access_key
+        self._override['access_key_id'] = access_key_id
+        self._override['secret_access_key'] = secret_access_key
         return self
 
     @property
     def aws_bedrock_api_key(self) -> Optional[str]:
         """获取 AWS Bedrock API Key"""
-        return self._aws_bedrock_api_key
+        return self._view.get('api_key')
 
     @property
     def aws_access_key_id(self) -> Optional[str]:
         """获取 AWS Access Key ID"""
-        return self._aws_access_key_id
+        return self._view.get('access_key_id')
 
     @property
     def aws_secret_access_key(self) -> Optional[str]:
         """获取 AWS Secret Access Key"""
-        return self._aws_secret_access_key
+        return self._view.get('secret_access_key')
 
     @property
     def has_ak_sk(self) -> bool:
         """检查是否配置了 AK/SK"""
-        return bool(self._aws_access_key_id and self._aws_secret_access_key)
+        return bool(self.aws_access_key_id and self.aws_secret_access_key)
 
     @property
     def model_id(self) -> str:
         """获取模型 ID"""
-        return self._model_id
+        return self._view['model_id']
     
     @property
     def aws_region(self) -> str:
         """获取 AWS Region"""
-        return self._aws_region
+        return self._view['aws_region']
     
     @property
     def use_iam_role(self) -> bool:
         """是否使用 IAM Role 认证"""
-        return self._use_iam_role
+        return self._view['use_iam_role']
     
     @property
     def authentication_mode(self) -> str:
@@ -173,10 +275,10 @@ class Config:
             'iam_role': 使用 IAM Role 认证
         """
         # 优先使用 API Key
-        if self._aws_bedrock_api_key and not self._use_iam_role:
+        if self.aws_bedrock_api_key and not self.use_iam_role:
             return 'api_key'
         # 其次使用 AK/SK
-        elif self.has_ak_sk and not self._use_iam_role:
+        elif self.has_ak_sk and not self.use_iam_role:
             return 'ak_sk'
         # 最后使用 IAM Role
         else:
@@ -192,44 +294,42 @@ class Config:
         - IAM Role 模式：确保 AWS_REGION 已设置，不设置凭证
         """
         # 设置模型 ID
-        if self._model_id:
-            os.environ['AWS_BEDROCK_MODEL_ID'] = self._model_id
+        if self.model_id:
+            self._setenv('AWS_BEDROCK_MODEL_ID', self.model_id)
 
         # 设置 AWS Region
-        if self._aws_region:
-            os.environ['AWS_REGION'] = self._aws_region
+        if self.aws_region:
+            self._setenv('AWS_REGION', self.aws_region)
             if 'AWS_DEFAULT_REGION' not in os.environ:
-                os.environ['AWS_DEFAULT_REGION'] = self._aws_region
+                self._setenv('AWS_DEFAULT_REGION', self.aws_region)
 
         auth_mode = self.authentication_mode
 
         # 根据认证模式设置相应的环境变量
         if auth_mode == 'api_key':
             # API Key 模式
-            if self._aws_bedrock_api_key:
-                os.environ['AWS_BEDROCK_API_KEY'] = self._aws_bedrock_api_key
+            if self.aws_bedrock_api_key:
+                self._setenv('AWS_BEDROCK_API_KEY', self.aws_bedrock_api_key)
                 print(f"✓ 认证模式: API Key 认证（本地开发模式）")
         elif auth_mode == 'ak_sk':
             # AK/SK 模式
             # 清除 API Key（如果存在）
-            if 'AWS_BEDROCK_API_KEY' in os.environ:
-                del os.environ['AWS_BEDROCK_API_KEY']
+            self._unsetenv('AWS_BEDROCK_API_KEY')
             # 设置 AK/SK
-            if self._aws_access_key_id:
-                os.environ['AWS_ACCESS_KEY_ID'] = self._aws_access_key_id
-            if self._aws_secret_access_key:
-                os.environ['AWS_SECRET_ACCESS_KEY'] = self._aws_secret_access_key
+            if self.aws_access_key_id:
+                self._setenv('AWS_ACCESS_KEY_ID', self.aws_access_key_id)
+            if self.aws_secret_access_key:
+                self._setenv('AWS_SECRET_ACCESS_KEY', self.aws_secret_access_key)
             print(f"✓ 认证模式: AK/SK 认证（跨账号访问模式）")
-            print(f"  AWS Region: {self._aws_region}")
-            print(f"  Access Key ID: {self._aws_access_key_id[:8]}...{self._aws_access_key_id[-4:]}" if self._aws_access_key_id else "  Access Key ID: 未设置")
+            print(f"  AWS Region: {self.aws_region}")
+            print(f"  Access Key ID: {self.aws_access_key_id[:8]}...{self.aws_access_key_id[-4:]}" if self.aws_access_key_id else "  Access Key ID: 未设置")
         else:
             # IAM Role 模式
             # 清除 API Key 和 AK/SK（如果存在），以确保使用 IAM Role
-            if 'AWS_BEDROCK_API_KEY' in os.environ:
-                del os.environ['AWS_BEDROCK_API_KEY']
+            self._unsetenv('AWS_BEDROCK_API_KEY')
             # 注意：不清除 AK/SK，因为 IAM Role 可能需要它们来获取临时凭证
             print(f"✓ 认证模式: IAM Role 认证（AWS 部署模式）")
-            print(f"  AWS Region: {self._aws_region}")
+            print(f"  AWS Region: {self.aws_region}")
     
     def is_configured(self) -> bool:
         """
@@ -239,9 +339,9 @@ class Config:
             True 如果配置了 API Key、AK/SK 或启用了 IAM Role 模式
         """
         return (
-            self._aws_bedrock_api_key is not None
+            self.aws_bedrock_api_key is not None
             or self.has_ak_sk
-            or self._use_iam_role
+            or self.use_iam_role
         )
     
     def validate(self) -> None:
@@ -256,7 +356,7 @@ class Config:
         auth_mode = self.authentication_mode
 
         if auth_mode == 'api_key':
-            if not self._aws_bedrock_api_key:
+            if not self.aws_bedrock_api_key:
                 raise ValueError(
                     "AWS Bedrock API Key 未配置。请通过以下方式之一配置:\n"
                     "1. 环境变量: export AWS_BEDROCK_API_KEY='your-key'\n"
@@ -271,7 +371,7 @@ class Config:
                 )
         elif auth_mode == 'ak_sk':
             # AK/SK 模式，确保两者都已配置
-            if not self._aws_access_key_id or not self._aws_secret_access_key:
+            if not self.aws_access_key_id or not self.aws_secret_access_key:
                 raise ValueError(
                     "AWS AK/SK 认证配置不完整。需要同时配置 Access Key ID 和 Secret Access Key。\n"
                     "请通过以下方式之一配置:\n"
@@ -284,7 +384,7 @@ class Config:
                     "3. 代码设置: config.set_aws_credentials('your-ak', 'your-sk')"
                 )
             # AK/SK 模式也需要 AWS Region
-            if not self._aws_region:
+            if not self.aws_region:
                 raise ValueError(
                     "AWS Region 未配置。AK/SK 认证模式需要配置 AWS Region。\n"
                     "请通过以下方式之一配置:\n"
@@ -294,7 +394,7 @@ class Config:
                 )
         else:
             # IAM Role 模式，确保 AWS Region 已配置
-            if not self._aws_region:
+            if not self.aws_region:
                 raise ValueError(
                     "AWS Region 未配置。IAM Role 认证模式需要配置 AWS Region。\n"
                     "请通过以下方式之一配置:\n"
@@ -308,8 +408,9 @@ class Config:
 # 便捷函数
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def get_config() -> Config:
-    """获取配置实例（单例）"""
+    """获取配置实例（首次调用时创建，之后返回同一实例）"""
     return Config()
 
 
@@ -351,6 +452,11 @@ def setup_config(
     """
     config = get_config()
 
+    # 已完整加载过且没有任何覆盖参数时直接返回
+    overrides = (api_key, access_key_id, secret_access_key, model_id, aws_region, use_iam_role)
+    if config._fully_loaded and all(value is None for value in overrides):
+        return config
+
     # 从 .env 文件加载（优先级最低）
     if use_dotenv:
         config.load_from_dotenv()
@@ -372,13 +478,14 @@ def setup_config(
         config.set_use_iam_role(use_iam_role)
 
     # 自动检测认证模式：如果在 AWS Lambda 环境且没有任何凭证，自动切换到 IAM Role 模式
-    if not config._aws_bedrock_api_key and not config.has_ak_sk and not config._use_iam_role:
+    if not config.aws_bedrock_api_key and not config.has_ak_sk and not config.use_iam_role:
         # 检测是否在 AWS Lambda 环境
-        if os.environ.get('AWS_EXECUTION_ENV') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        if config._getenv('AWS_EXECUTION_ENV') or config._getenv('AWS_LAMBDA_FUNCTION_NAME'):
             config.set_use_iam_role(True)
 
     # 设置到环境变量
     config.setup_environment()
+    config._fully_loaded = True
 
     return config
 
@@ -400,16 +507,17 @@ def ensure_configured() -> Config:
     """
     config = get_config()
     
-    if not config.is_configured():
+    if not config._fully_loaded and not config.is_configured():
         # 尝试自动加载
         config.load_from_dotenv().load_from_env()
         
         # 如果仍未配置且在 AWS Lambda 环境，自动启用 IAM Role 模式
         if not config.is_configured():
-            if os.environ.get('AWS_EXECUTION_ENV') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+            if config._getenv('AWS_EXECUTION_ENV') or config._getenv('AWS_LAMBDA_FUNCTION_NAME'):
                 config.set_use_iam_role(True)
         
         config.setup_environment()
+        config._fully_loaded = True
     
     # 验证配置
     config.validate()
@@ -2,9 +2,12 @@
 层级执行器 - 支持事件流式输出的执行器
 """
 
+import functools
+import importlib
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Optional
 from io import StringIO
 import sys
 
@@ -23,7 +26,35 @@ from .api_models import (
     ExecutionResponse,
     ExecutionMode
 )
-from strands_tools import calculator, http_request
+
+
+# 内置工具名称 -> 模块路径（strands_tools 导入开销较大，首次使用时才加载）
+_TOOL_MODULES = {
+    'calculator': 'strands_tools.calculator',
+    'http_request': 'strands_tools.http_request'
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tool(module_path: str) -> Any:
+    """按需导入工具模块（结果缓存，每个工具只导入一次）"""
+    return importlib.import_module(module_path)
+
+
+class _LazyToolMap(Mapping):
+    """工具名称 -> 工具模块的只读映射，取值时才导入对应模块"""
+
+    def __init__(self, module_paths: Dict[str, str]):
+        self._module_paths = module_paths
+
+    def __getitem__(self, name: str) -> Any:
+        return _load_tool(self._module_paths[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._module_paths)
+
+    def __len__(self) -> int:
+        return len(self._module_paths)
 
 
 class EventCapture:
@@ -82,11 +113,8 @@ class HierarchyExecutor:
     4. 提供拓扑信息
     """
     
-    # 工具映射表
-    TOOL_MAP = {
-        'calculator': calculator,
-        'http_request': http_request
-    }
+    # 工具映射表（名称 -> 工具模块，按需导入）
+    TOOL_MAP: Mapping = _LazyToolMap(_TOOL_MODULES)
     
     def __init__(self):
         self.event_capture = EventCapture()
@@ -240,7 +268,7 @@ class HierarchyExecutor:
 
             # 查找团队 ID
             for team_info in self.topology_info.teams:
-                if team_info['team_name'] == call['team_name']:
+                if team_info['team_name'] == call.team_name:
                     team_id = team_info['team_id']
                     supervisor_id = team_info['supervisor_id']
                     break
@@ -248,10 +276,10 @@ class HierarchyExecutor:
             # 添加团队开始事件
             events.append(InternalEvent(
                 event_type=EventType.TEAM_STARTED,
-                timestamp=call['start_time'],
+                timestamp=call.start_time,
                 data={
-                    'team_name': call['team_name'],
-                    'task': call['task']
+                    'team_name': call.team_name,
+                    'task': call.task
                 },
                 topology_metadata={
                     'team_id': team_id,
@@ -260,13 +288,13 @@ class HierarchyExecutor:
             ))
 
             # 如果已完成，添加完成事件
-            if call['status'] == 'completed':
+            if call.status == 'completed':
                 events.append(InternalEvent(
                     event_type=EventType.TEAM_COMPLETED,
-                    timestamp=call.get('end_time', datetime.now().isoformat()),
+                    timestamp=call.end_time or datetime.now().isoformat(),
                     data={
-                        'team_name': call['team_name'],
-                        'result_preview': call.get('result', '')[:200]
+                        'team_name': call.team_name,
+                        'result_preview': (call.result or '')[:200]
                     },
                     topology_metadata={
                         'team_id': team_id,
@@ -360,6 +388,9 @@ class HierarchyExecutor:
             
             # 8. 获取统计信息
             statistics = tracker.get_statistics() if tracker else None
+            if statistics:
+                # team_calls 为只读视图，写入数据库和事件前转换为普通字典
+                statistics['team_calls'] = dict(statistics['team_calls'])
             
             # 9. 合并所有事件
             all_events = execution_events + self.event_capture.get_events()
@@ -12,18 +12,20 @@
 - 调用统计：提供详细的调用次数和状态信息
 """
 
+import functools
 import hashlib
 import re
-import types
-import uuid
+import threading
+from collections import OrderedDict, defaultdict
+from types import MappingProxyType
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Callable, Set
+from typing import Dict, List, Any, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 
 from strands import Agent, tool
 from strands.models import BedrockModel
+from strands.tools.executors import ConcurrentToolExecutor, SequentialToolExecutor
 
-from strands_tools import calculator, http_request
 from ..streaming.llm_callback import (
     CallerContext, LLMCallbackHandler, create_callback_handler
 )
@@ -65,12 +67,13 @@ def create_model_from_id(model_id: Optional[str], temperature: float = 0.7, max_
     )
 
 
+@functools.lru_cache(maxsize=1024)
 def generate_deterministic_id(*parts: str) -> str:
     """
     生成确定性 ID
 
     基于输入的各部分生成一个确定性的短 ID，
-    同样的输入始终产生相同的输出。
+    同样的输入始终产生相同的输出（结果缓存，重复构建同一层级时无需重新哈希）。
 
     Args:
         *parts: 用于生成 ID 的字符串部分
@@ -83,10 +86,96 @@ def generate_deterministic_id(*parts: str) -> str:
     return hash_obj.hexdigest()[:12]
 
 
+# ============================================================================
+# 提示词模板
+# ============================================================================
+
+# Team Supervisor 执行规则（占位符：team_name, worker_list, num_workers）
+_TEAM_RULES_TEMPLATE = """
+================================================================================
+CRITICAL INSTRUCTIONS FOR TEAM SUPERVISOR - STRICT SEQUENTIAL EXECUTION
+================================================================================
+
+You are the TEAM SUPERVISOR of [{team_name}].
+Your ONLY job is to delegate tasks to your team members (workers).
+
+[ABSOLUTE RULES - VIOLATION IS FORBIDDEN]
+
+1. You must NEVER answer questions directly. NO EXCEPTIONS.
+2. You must ALWAYS call worker tools to handle the task.
+3. Each worker can ONLY be called ONCE.
+4. You MUST call EVERY worker ({num_workers} total).
+
+[YOUR TEAM MEMBERS]
+{worker_list}
+
+================================================================================
+⛔⛔⛔ STRICT SINGLE TOOL CALL RULE ⛔⛔⛔
+================================================================================
+
+**ABSOLUTE REQUIREMENT: You can ONLY call ONE tool per response!**
+
+After calling a tool, you MUST:
+1. STOP generating any more content
+2. WAIT for the tool result to come back
+3. Only AFTER receiving the result, continue with next action
+
+❌ FORBIDDEN: Calling multiple tools in one response
+❌ FORBIDDEN: Continuing to write after a tool call
+❌ FORBIDDEN: Planning next steps before seeing tool result
+
+✅ CORRECT: Call ONE tool → STOP → Wait for result → Then respond again
+
+================================================================================
+MANDATORY WORKFLOW - ONE TOOL CALL THEN STOP
+================================================================================
+
+**Each response should follow this pattern:**
+
+[Team: {team_name} | Supervisor] THINKING: <brief analysis>
+[Team: {team_name} | Supervisor] SELECT: <worker name>
+<call the worker tool>
+<STOP HERE - DO NOT WRITE ANYTHING ELSE>
+
+**After receiving the tool result, in your NEXT response:**
+- Analyze the result
+- If more workers needed: repeat the pattern above
+- If all workers done: output SUMMARY
+
+================================================================================
+EXECUTION STATUS
+================================================================================
+- Workers marked ⭕ = NOT executed yet (you MUST call these)
+- Workers marked ✅ = Already completed (do NOT call again)
+
+================================================================================
+FAILURE CONDITIONS
+================================================================================
+- ❌ Calling multiple tools in one response
+- ❌ Writing content after a tool call (must STOP immediately)
+- ❌ Skipping any worker marked ⭕
+- ❌ Answering directly without calling workers
+"""
+
+
+@functools.lru_cache(maxsize=256)
+def _render_team_rules(team_name: str, worker_names: Tuple[str, ...]) -> str:
+    """渲染团队执行规则（同一团队的规则文本不变，渲染结果缓存复用）"""
+    return _TEAM_RULES_TEMPLATE.format(
+        team_name=team_name,
+        worker_list=", ".join(worker_names),
+        num_workers=len(worker_names)
+    )
+
+
 # ============================================================================
 # 调用追踪系统
 # ============================================================================
 
+# 执行状态行格式，按“是否已执行”（False/True）索引
+_STATUS_LINE_FORMATS = ("  ⭕ {} - 未执行", "  ✅ {} - 已执行")
+
+
 class ExecutionTracker:
     """
     执行追踪器 - 跟踪已执行的 Team 和 Worker
@@ -104,6 +193,10 @@ class ExecutionTracker:
         self.team_results: Dict[str, str] = {}
         # Worker 执行结果字典
         self.worker_results: Dict[str, str] = {}
+        # 执行状态渲染缓存：(团队列表, Worker 列表) -> 状态字符串，任何执行记录变化时清空
+        self._status_cache: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], str] = {}
+        # 并行执行时团队/Worker 可能在不同线程中同时写入
+        self._lock = threading.Lock()
     
     def mark_team_executed(self, team_name: str, result: str):
         """
@@ -113,8 +206,10 @@ class ExecutionTracker:
             team_name: 团队名称
             result: 执行结果
         """
-        self.executed_teams.add(team_name)
-        self.team_results[team_name] = result
+        with self._lock:
+            self.executed_teams.add(team_name)
+            self.team_results[team_name] = result
+            self._status_cache.clear()
     
     def mark_worker_executed(self, worker_name: str, result: str):
         """
@@ -124,8 +219,10 @@ class ExecutionTracker:
             worker_name: Worker 名称
             result: 执行结果
         """
-        self.executed_workers.add(worker_name)
-        self.worker_results[worker_name] = result
+        with self._lock:
+            self.executed_workers.add(worker_name)
+            self.worker_results[worker_name] = result
+            self._status_cache.clear()
     
     def is_team_executed(self, team_name: str) -> bool:
         """
@@ -188,34 +285,54 @@ class ExecutionTracker:
         Returns:
             格式化的执行状态字符串
         """
-        status_lines = []
-        
-        # 生成团队执行状态
-        if available_teams:
-            status_lines.append("【团队执行状态】")
-            for team in available_teams:
-                if team in self.executed_teams:
-                    status_lines.append(f"  ✅ {team} - 已执行")
-                else:
-                    status_lines.append(f"  ⭕ {team} - 未执行")
-        
-        # 生成 Worker 执行状态
-        if available_workers:
-            status_lines.append("\n【成员执行状态】")
-            for worker in available_workers:
-                if worker in self.executed_workers:
-                    status_lines.append(f"  ✅ {worker} - 已执行")
-                else:
-                    status_lines.append(f"  ⭕ {worker} - 未执行")
-        
-        return "\n".join(status_lines)
+        cache_key = (tuple(available_teams or ()), tuple(available_workers or ()))
+        # 查缓存、渲染与写缓存都在锁内完成，避免并行标记穿插其间时缓存旧状态
+        with self._lock:
+            cached = self._status_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            status_lines = []
+
+            # 生成团队执行状态
+            if available_teams:
+                executed = self.executed_teams
+                status_lines.append("【团队执行状态】")
+                status_lines.extend(
+                    _STATUS_LINE_FORMATS[team in executed].format(team) for team in available_teams
+                )
+
+            # 生成 Worker 执行状态
+            if available_workers:
+                executed = self.executed_workers
+                status_lines.append("\n【成员执行状态】")
+                status_lines.extend(
+                    _STATUS_LINE_FORMATS[worker in executed].format(worker) for worker in available_workers
+                )
+
+            status = self._status_cache[cache_key] = "\n".join(status_lines)
+            return status
     
     def reset(self):
         """重置追踪器，清空所有执行记录"""
-        self.executed_teams.clear()
-        self.executed_workers.clear()
-        self.team_results.clear()
-        self.worker_results.clear()
+        with self._lock:
+            self.executed_teams.clear()
+            self.executed_workers.clear()
+            self.team_results.clear()
+            self.worker_results.clear()
+            self._status_cache.clear()
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """单次团队调用记录"""
+    call_id: str
+    team_name: str
+    task: str
+    start_time: str
+    status: str = 'in_progress'
+    end_time: Optional[str] = None
+    result: Optional[str] = None
 
 
 class CallTracker:
@@ -228,13 +345,19 @@ class CallTracker:
     def __init__(self):
         """初始化调用追踪器"""
         # 调用历史记录列表
-        self.call_history: List[Dict[str, Any]] = []
+        self.call_history: List[CallRecord] = []
+        # call_id -> 调用记录（与 call_history 共享同一记录对象，用于 O(1) 查找）
+        self._call_index: Dict[str, CallRecord] = {}
         # 每个团队的调用次数
-        self.team_calls: Dict[str, int] = {}
+        self.team_calls: defaultdict[str, int] = defaultdict(int)
         # 当前正在执行的团队集合
         self.active_teams: Set[str] = set()
+        # 已完成的调用数（在 end_call 中递增，避免统计时遍历调用历史）
+        self.completed_count: int = 0
         # 执行追踪器实例
         self.execution_tracker = ExecutionTracker()
+        # 并行执行时多个团队会同时开始/结束调用
+        self._lock = threading.Lock()
     
     def start_call(self, team_name: str, task: str) -> str:
         """
@@ -249,23 +372,25 @@ class CallTracker:
         Returns:
             调用 ID（格式：团队名_序号）
         """
-        # 生成唯一的调用 ID
-        call_id = f"{team_name}_{len(self.call_history)}"
-        
-        # 记录调用信息
-        self.call_history.append({
-            'call_id': call_id,
-            'team_name': team_name,
-            'task': task,
-            'start_time': datetime.now().isoformat(),
-            'status': 'in_progress'
-        })
-        
-        # 更新调用次数
-        self.team_calls[team_name] = self.team_calls.get(team_name, 0) + 1
-        # 标记团队为活跃状态
-        self.active_teams.add(team_name)
-        
+        with self._lock:
+            # 生成唯一的调用 ID
+            call_id = f"{team_name}_{len(self.call_history)}"
+
+            # 记录调用信息
+            call = CallRecord(
+                call_id=call_id,
+                team_name=team_name,
+                task=task,
+                start_time=datetime.now().isoformat()
+            )
+            self.call_history.append(call)
+            self._call_index[call_id] = call
+
+            # 更新调用次数
+            self.team_calls[team_name] += 1
+            # 标记团队为活跃状态
+            self.active_teams.add(team_name)
+
         return call_id
     
     def end_call(self, call_id: str, result: str):
@@ -278,19 +403,21 @@ class CallTracker:
             call_id: 调用 ID
             result: 执行结果
         """
-        # 查找对应的调用记录
-        for call in self.call_history:
-            if call['call_id'] == call_id:
-                # 更新调用记录
-                call['end_time'] = datetime.now().isoformat()
-                call['result'] = result
-                call['status'] = 'completed'
-                
-                # 从活跃团队中移除
-                team_name = call['team_name']
-                if team_name in self.active_teams:
-                    self.active_teams.remove(team_name)
-                break
+        with self._lock:
+            # 查找对应的调用记录
+            call = self._call_index.get(call_id)
+            if call is None:
+                return
+
+            # 更新调用记录
+            if call.status != 'completed':
+                self.completed_count += 1
+            call.end_time = datetime.now().isoformat()
+            call.result = result
+            call.status = 'completed'
+
+            # 从活跃团队中移除
+            self.active_teams.discard(call.team_name)
     
     def is_team_active(self, team_name: str) -> bool:
         """
@@ -322,12 +449,13 @@ class CallTracker:
         
         Returns:
             包含总调用次数、各团队调用次数、活跃团队和完成调用数的字典
+            （team_calls 为只读视图，需要序列化时由调用方转换为 dict）
         """
         return {
             'total_calls': len(self.call_history),
-            'team_calls': self.team_calls.copy(),
+            'team_calls': MappingProxyType(self.team_calls),
             'active_teams': list(self.active_teams),
-            'completed_calls': sum(1 for c in self.call_history if c['status'] == 'completed')
+            'completed_calls': self.completed_count
         }
     
     def get_call_log(self) -> str:
@@ -341,12 +469,12 @@ class CallTracker:
         """
         log_lines = ["调用日志:", "=" * 60]
         for call in self.call_history:
-            log_lines.append(f"\n[{call['call_id']}]")
-            log_lines.append(f"  团队: {call['team_name']}")
-            log_lines.append(f"  任务: {call['task'][:50]}...")
-            log_lines.append(f"  状态: {call['status']}")
-            if 'result' in call:
-                log_lines.append(f"  结果: {call['result'][:100]}...")
+            log_lines.append(f"\n[{call.call_id}]")
+            log_lines.append(f"  团队: {call.team_name}")
+            log_lines.append(f"  任务: {call.task[:50]}...")
+            log_lines.append(f"  状态: {call.status}")
+            if call.result is not None:
+                log_lines.append(f"  结果: {call.result[:100]}...")
         return "\n".join(log_lines)
 
 
@@ -354,7 +482,7 @@ class CallTracker:
 # 配置数据结构
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class WorkerConfig:
     """Worker Agent 配置"""
     name: str
@@ -370,7 +498,7 @@ class WorkerConfig:
     model_id: Optional[str] = None  # LLM 模型 ID，如 gemini-2.0-flash
 
 
-@dataclass
+@dataclass(slots=True)
 class TeamConfig:
     """Team 配置"""
     name: str
@@ -387,7 +515,7 @@ class TeamConfig:
     model_id: Optional[str] = None  # Team Supervisor LLM 模型 ID
 
 
-@dataclass
+@dataclass(slots=True)
 class GlobalConfig:
     """Global Supervisor 配置"""
     system_prompt: str
@@ -415,8 +543,12 @@ class WorkerAgentFactory:
     负责创建 Worker Agent 实例，并管理 Worker 的调用追踪和防重复机制。
     """
 
-    # 类级别的调用追踪器（记录任务哈希 -> 结果）
-    _worker_call_tracker = {}
+    # 类级别的调用追踪器（记录 (Worker 名称, 任务内容) -> 结果）
+    # 进程级共享且不会自动清空，按 LRU 限制条目数，避免长期运行的服务内存持续增长
+    _worker_call_tracker: 'OrderedDict[Tuple[str, str], str]' = OrderedDict()
+    _WORKER_CALL_TRACKER_MAX = 10_000
+    # 并行执行时多个 Worker 会同时读写调用追踪器（LRU 调整顺序/淘汰需互斥）
+    _worker_call_lock = threading.Lock()
     # 类级别的执行追踪器引用
     _execution_tracker: Optional['ExecutionTracker'] = None
     # 类级别的 run_id（用于跨线程回调查找）
@@ -450,37 +582,42 @@ class WorkerAgentFactory:
         Returns:
             提示消息字符串或 None
         """
-        if WorkerAgentFactory._execution_tracker and WorkerAgentFactory._execution_tracker.is_worker_executed(config.name):
+        tracker = WorkerAgentFactory._execution_tracker
+        if tracker and tracker.is_worker_executed(config.name):
             print_worker_warning(f"⚠️ [{config.name}] 该专家已经执行过，请直接使用之前的结果，不要重复调用")
             return OutputFormatter.format_executed_message(config.name)
         return None
     
     @staticmethod
-    def _check_duplicate_task(config: WorkerConfig, task: str) -> Optional[str]:
+    def _check_duplicate_task(config: WorkerConfig, task: str) -> Tuple[Tuple[str, str], Optional[str]]:
         """
         检查是否重复任务
         
-        基于任务内容的哈希值检查是否已经处理过相同任务。
+        以 (Worker 名称, 任务内容) 作为键检查是否已经处理过相同任务。
         
         Args:
             config: Worker 配置
             task: 任务描述
             
         Returns:
-            如果是重复任务，返回提示消息；否则返回 call_key
+            (call_key, duplicate_msg) 元组；非重复任务时 duplicate_msg 为 None
         """
-        # 生成任务哈希值（前8位）
-        task_hash = hashlib.md5(task.encode('utf-8')).hexdigest()[:8]
-        call_key = f"{config.name}_{task_hash}"
+        # 直接以元组作为字典键，由字典自身完成哈希，无需额外计算摘要
+        call_key = (config.name, task)
         
         # 检查是否已处理过相同任务
-        if call_key in WorkerAgentFactory._worker_call_tracker:
+        call_tracker = WorkerAgentFactory._worker_call_tracker
+        with WorkerAgentFactory._worker_call_lock:
+            is_duplicate = call_key in call_tracker
+            if is_duplicate:
+                call_tracker.move_to_end(call_key)
+        if is_duplicate:
             OutputFormatter.print_worker_duplicate_task_warning(config.name)
-            return OutputFormatter.format_duplicate_task_message(config.name)
-        return call_key
+            return call_key, OutputFormatter.format_duplicate_task_message(config.name)
+        return call_key, None
     
     @staticmethod
-    def _execute_worker(config: WorkerConfig, task: str, call_key: str) -> str:
+    def _execute_worker(config: WorkerConfig, task: str, call_key: Tuple[str, str]) -> str:
         """
         执行 Worker 任务
 
@@ -494,6 +631,10 @@ class WorkerAgentFactory:
         Returns:
             执行结果字符串
         """
+        # 类属性在执行期间不会改变，入口处绑定为局部变量，避免重复属性查找
+        run_id = WorkerAgentFactory._current_run_id
+        execution_tracker = WorkerAgentFactory._execution_tracker
+
         # 获取当前团队上下文
         current_team = OutputFormatter.get_current_team()
 
@@ -508,7 +649,7 @@ class WorkerAgentFactory:
         # 创建回调处理器（Worker 上下文，使用 agent_id，传入 run_id 支持跨线程）
         callback_handler = create_callback_handler(
             CallerContext.worker(config.agent_id or config.id, config.name, current_team or "Unknown"),
-            run_id=WorkerAgentFactory._current_run_id
+            run_id=run_id
         )
 
         # 确定使用的模型：优先使用 model_id 创建模型，其次使用 config.model
@@ -532,7 +673,7 @@ class WorkerAgentFactory:
         # 发送 agent.completed 事件（用于 SSEManager 的串行化切换）
         from ..streaming.llm_callback import get_event_callback
         from .api_models import EventCategory, EventAction
-        event_callback = get_event_callback(WorkerAgentFactory._current_run_id) if WorkerAgentFactory._current_run_id else None
+        event_callback = get_event_callback(run_id) if run_id else None
         if event_callback:
             event_callback({
                 'source': callback_handler.caller_context.to_source_dict(),
@@ -548,9 +689,14 @@ class WorkerAgentFactory:
         result = OutputFormatter.format_result_message(config.name, response_text)
 
         # 记录执行结果
-        WorkerAgentFactory._worker_call_tracker[call_key] = result
-        if WorkerAgentFactory._execution_tracker:
-            WorkerAgentFactory._execution_tracker.mark_worker_executed(config.name, result)
+        call_tracker = WorkerAgentFactory._worker_call_tracker
+        with WorkerAgentFactory._worker_call_lock:
+            call_tracker[call_key] = result
+            call_tracker.move_to_end(call_key)
+            while len(call_tracker) > WorkerAgentFactory._WORKER_CALL_TRACKER_MAX:
+                call_tracker.popitem(last=False)
+        if execution_tracker:
+            execution_tracker.mark_worker_executed(config.name, result)
 
         return result
     
@@ -579,9 +725,9 @@ class WorkerAgentFactory:
                 return executed_msg
 
             # 2. 检查重复任务
-            call_key = WorkerAgentFactory._check_duplicate_task(config, task)
-            if isinstance(call_key, str) and call_key.startswith('['):
-                return call_key  # 返回重复消息
+            call_key, duplicate_msg = WorkerAgentFactory._check_duplicate_task(config, task)
+            if duplicate_msg is not None:
+                return duplicate_msg  # 返回重复消息
 
             # 3. 执行任务
             try:
@@ -591,24 +737,19 @@ class WorkerAgentFactory:
                 print_worker_error(error_msg)
                 return error_msg
 
-        # 创建具有正确名称的函数（在应用 @tool 装饰器之前）
-        doc_string = f"调用 {config.name} ({config.role}) 来执行任务"
-        worker_agent = types.FunctionType(
-            worker_agent_impl.__code__,
-            worker_agent_impl.__globals__,
-            name=func_name,
-            argdefs=worker_agent_impl.__defaults__,
-            closure=worker_agent_impl.__closure__
-        )
-        worker_agent.__doc__ = doc_string
+        # 设置函数名称和文档（在应用 @tool 装饰器之前，@tool 以 __name__ 作为工具名）
+        worker_agent_impl.__name__ = func_name
+        worker_agent_impl.__qualname__ = func_name
+        worker_agent_impl.__doc__ = f"调用 {config.name} ({config.role}) 来执行任务"
 
         # 应用 @tool 装饰器
-        return tool(worker_agent)
+        return tool(worker_agent_impl)
     
     @staticmethod
     def reset_tracker():
         """重置调用追踪器，清空所有调用记录"""
-        WorkerAgentFactory._worker_call_tracker.clear()
+        with WorkerAgentFactory._worker_call_lock:
+            WorkerAgentFactory._worker_call_tracker.clear()
 
 
 # ============================================================================
@@ -638,12 +779,18 @@ class TeamSupervisorFactory:
         if not enable_context_sharing or not config.share_context:
             return []
         
-        other_teams_context = []
-        for team_name in tracker.execution_tracker.executed_teams:
-            if team_name != config.name:  # 排除自己
-                result = tracker.execution_tracker.get_team_result(team_name)
-                if result:
-                    other_teams_context.append(f"\n【{team_name}的研究成果】：\n{result}")
+        execution_tracker = tracker.execution_tracker
+        # 排除自己（集合差集一次完成，同时得到执行集合的快照）
+        other_teams = execution_tracker.executed_teams - {config.name}
+        if not other_teams:
+            return []
+
+        team_results = execution_tracker.team_results
+        other_teams_context = [
+            f"\n【{team_name}的研究成果】：\n{result}"
+            for team_name in other_teams
+            if (result := team_results.get(team_name))
+        ]
         
         if other_teams_context:
             return [
@@ -717,89 +864,22 @@ class TeamSupervisorFactory:
         """
         # 获取执行状态
         execution_status = tracker.execution_tracker.get_execution_status(available_workers=worker_names)
-        enhanced_task_parts = [task, "", execution_status]
-        
-        # 添加上下文共享内容（如果启用）
+        # 执行规则 - 严格单工具调用限制（按团队缓存渲染结果）
+        rules = _render_team_rules(config.name, tuple(worker_names))
+
+        # 未启用上下文共享或尚无团队完成时，无需构建共享内容
+        if not (enable_context_sharing and config.share_context and tracker.execution_tracker.executed_teams):
+            return f"{task}\n\n{execution_status}\n{rules}"
+
+        # 添加上下文共享内容
         context_sharing_content = TeamSupervisorFactory._build_context_sharing_content(
             config, tracker, enable_context_sharing
         )
         if context_sharing_content:
-            enhanced_task_parts.insert(1, context_sharing_content[0])
-            enhanced_task_parts.append(context_sharing_content[1])
-        
-        # 获取团队名称用于标签
-        team_name = config.name
-        worker_list = ", ".join(worker_names)
-        num_workers = len(worker_names)
-
-        # 添加执行规则 - 严格单工具调用限制
-        enhanced_task_parts.append(f"""
-================================================================================
-CRITICAL INSTRUCTIONS FOR TEAM SUPERVISOR - STRICT SEQUENTIAL EXECUTION
-================================================================================
-
-You are the TEAM SUPERVISOR of [{team_name}].
-Your ONLY job is to delegate tasks to your team members (workers).
+            shared_context, context_hint = context_sharing_content
+            return f"{task}\n{shared_context}\n\n{execution_status}\n{context_hint}\n{rules}"
 
-[ABSOLUTE RULES - VIOLATION IS FORBIDDEN]
-
-1. You must NEVER answer questions directly. NO EXCEPTIONS.
-2. You must ALWAYS call worker tools to handle the task.
-3. Each worker can ONLY be called ONCE.
-4. You MUST call EVERY worker ({num_workers} total).
-
-[YOUR TEAM MEMBERS]
-{worker_list}
-
-================================================================================
-⛔⛔⛔ STRICT SINGLE TOOL CALL RULE ⛔⛔⛔
-================================================================================
-
-**ABSOLUTE REQUIREMENT: You can ONLY call ONE tool per response!**
-
-After calling a tool, you MUST:
-1. STOP generating any more content
-2. WAIT for the tool result to come back
-3. Only AFTER receiving the result, continue with next action
-
-❌ FORBIDDEN: Calling multiple tools in one response
-❌ FORBIDDEN: Continuing to write after a tool call
-❌ FORBIDDEN: Planning next steps before seeing tool result
-
-✅ CORRECT: Call ONE tool → STOP → Wait for result → Then respond again
-
-================================================================================
-MANDATORY WORKFLOW - ONE TOOL CALL THEN STOP
-================================================================================
-
-**Each response should follow this pattern:**
-
-[Team: {team_name} | Supervisor] THINKING: <brief analysis>
-[Team: {team_name} | Supervisor] SELECT: <worker name>
-<call the worker tool>
-<STOP HERE - DO NOT WRITE ANYTHING ELSE>
-
-**After receiving the tool result, in your NEXT response:**
-- Analyze the result
-- If more workers needed: repeat the pattern above
-- If all workers done: output SUMMARY
-
-================================================================================
-EXECUTION STATUS
-================================================================================
-- Workers marked ⭕ = NOT executed yet (you MUST call these)
-- Workers marked ✅ = Already completed (do NOT call again)
-
-================================================================================
-FAILURE CONDITIONS
-================================================================================
-- ❌ Calling multiple tools in one response
-- ❌ Writing content after a tool call (must STOP immediately)
-- ❌ Skipping any worker marked ⭕
-- ❌ Answering directly without calling workers
-""")
-        
-        return "\n".join(enhanced_task_parts)
+        return f"{task}\n\n{execution_status}\n{rules}"
     
     @staticmethod
     def create_supervisor(config: TeamConfig, tracker: CallTracker, enable_context_sharing: bool = False) -> Callable:
@@ -823,9 +903,28 @@ FAILURE CONDITIONS
         worker_tools = [WorkerAgentFactory.create_worker(w) for w in config.workers]
         # 生成符合 AWS Bedrock 规范的函数名
         func_name = f"team_{config.id.replace('-', '_')}"
-        
-        def team_supervisor_impl(task: str) -> str:
-            """Team Supervisor 实现函数"""
+
+        # 创建回调处理器（Team Supervisor 上下文，使用 agent_id，传入 run_id 支持跨线程）
+        team_callback_handler = create_callback_handler(
+            CallerContext.team_supervisor(config.agent_id or config.id, f"{config.name}主管", config.name),
+            run_id=WorkerAgentFactory._current_run_id
+        )
+
+        # 确定使用的模型：优先使用 model_id 创建模型，其次使用 config.model
+        model = config.model
+        if config.model_id:
+            model = create_model_from_id(config.model_id, config.temperature, config.max_tokens)
+
+        # 创建 Team Supervisor Agent（每个团队一个实例，跨调用复用）
+        supervisor = Agent(
+            system_prompt=config.system_prompt,
+            tools=worker_tools,
+            model=model,
+            callback_handler=team_callback_handler
+        )
+
+        async def team_supervisor_impl(task: str) -> str:
+            """Team Supervisor 实现函数（协程：并行模式下多个团队在同一事件循环中并发执行）"""
             # 1. 检查是否已执行
             if executed_msg := TeamSupervisorFactory._check_team_executed(config, tracker):
                 return executed_msg
@@ -852,29 +951,12 @@ FAILURE CONDITIONS
                     task, worker_names, tracker, config, enable_context_sharing
                 )
 
-                # 7. 创建回调处理器（Team Supervisor 上下文，使用 agent_id，传入 run_id 支持跨线程）
-                team_callback_handler = create_callback_handler(
-                    CallerContext.team_supervisor(config.agent_id or config.id, f"{config.name}主管", config.name),
-                    run_id=WorkerAgentFactory._current_run_id
-                )
-
-                # 确定使用的模型：优先使用 model_id 创建模型，其次使用 config.model
-                model = config.model
-                if config.model_id:
-                    model = create_model_from_id(config.model_id, config.temperature, config.max_tokens)
-
-                # 8. 创建 Agent
-                supervisor = Agent(
-                    system_prompt=config.system_prompt,
-                    tools=worker_tools,
-                    model=model,
-                    callback_handler=team_callback_handler
-                )
-
-                # 执行任务
-                response = supervisor(enhanced_task)
+                # 7. 执行任务（异步调用，等待 LLM 期间不占用线程）
+                # 清空上次调用（如出错后重试）遗留的对话历史，保证每次调用相互独立
+                supervisor.messages.clear()
+                response = await supervisor.invoke_async(enhanced_task)
 
-                # 9. 完成执行（记录结果）
+                # 8. 完成执行（记录结果）
                 print_team_complete(config.name, agent_id=team_agent_id)
 
                 # 发送 agent.completed 事件
@@ -906,19 +988,13 @@ FAILURE CONDITIONS
                 tracker.end_call(call_id, error_msg)
                 return error_msg
         
-        # 创建具有正确名称的函数
-        doc_string = f"调用{config.name} - 协调 {len(config.workers)} 名团队成员完成任务"
-        team_supervisor = types.FunctionType(
-            team_supervisor_impl.__code__,
-            team_supervisor_impl.__globals__,
-            name=func_name,
-            argdefs=team_supervisor_impl.__defaults__,
-            closure=team_supervisor_impl.__closure__
-        )
-        team_supervisor.__doc__ = doc_string
-        
+        # 设置函数名称和文档（@tool 以 __name__ 作为工具名）
+        team_supervisor_impl.__name__ = func_name
+        team_supervisor_impl.__qualname__ = func_name
+        team_supervisor_impl.__doc__ = f"调用{config.name} - 协调 {len(config.workers)} 名团队成员完成任务"
+
         # 应用 @tool 装饰器
-        return tool(team_supervisor)
+        return tool(team_supervisor_impl)
 
 
 # ============================================================================
@@ -958,10 +1034,82 @@ class GlobalSupervisorFactory:
         # Build team list for prompt
         team_list_str = "\n".join([f"  - {team.name}" for team in config.teams])
 
-        # Enhanced system prompt with STRICT single tool call constraint
-        execution_mode = "SEQUENTIAL" if not config.parallel_execution else "PARALLEL"
+        if config.parallel_execution:
+            # 并行模式：允许一次响应中调度所有未执行的团队，由 ConcurrentToolExecutor 并发执行
+            enhanced_prompt = f"""{config.system_prompt}
+
+================================================================================
+CRITICAL INSTRUCTIONS - PARALLEL EXECUTION
+================================================================================
+
+You are a COORDINATOR/DISPATCHER. Your ONLY job is to delegate tasks to teams.
+
+[ABSOLUTE RULES - VIOLATION IS FORBIDDEN]
+
+1. You must NEVER answer questions directly. NO EXCEPTIONS.
+2. You must ALWAYS call team tools to handle the task.
+3. Even if the task is unclear, you MUST select the most appropriate team(s).
+4. You are NOT allowed to ask clarifying questions - just delegate to teams.
+5. You must call ALL available teams - not just one or two.
+
+[EXECUTION MODE: PARALLEL]
+
+- Each team can ONLY be called ONCE
+- Teams marked with ✅ are already completed - do NOT call them again
+- Only call teams marked with ⭕ (not executed)
+
+[AVAILABLE TEAMS]
+{team_list_str}
+
+================================================================================
+⚡⚡⚡ PARALLEL DISPATCH RULE ⚡⚡⚡
+================================================================================
 
-        enhanced_prompt = f"""{config.system_prompt}
+**Teams work independently and run concurrently.**
+
+In a SINGLE response, call the tool of EVERY team marked ⭕.
+All of these calls are executed at the same time.
+
+After dispatching, you MUST:
+1. STOP generating any more content
+2. WAIT for ALL tool results to come back
+3. Only AFTER receiving the results, continue in a NEW response
+
+❌ FORBIDDEN: Calling the same team more than once
+❌ FORBIDDEN: Continuing to write after the tool calls
+
+✅ CORRECT: Call ALL ⭕ teams → STOP → Wait for results → Then SYNTHESIZE
+
+================================================================================
+MANDATORY WORKFLOW - DISPATCH ALL THEN SYNTHESIZE
+================================================================================
+
+[Global Supervisor] THINKING: <brief analysis of current status>
+[Global Supervisor] SELECT: <all team names marked ⭕>
+<call every selected team tool>
+<STOP HERE - DO NOT WRITE ANYTHING ELSE>
+
+**After receiving the tool results, in your NEXT response:**
+- If any team is still marked ⭕: dispatch it as above
+- If all teams are ✅: output SYNTHESIS with final summary
+
+================================================================================
+FAILURE CONDITIONS
+================================================================================
+- ❌ Calling the same team more than once
+- ❌ Writing content after the tool calls (must STOP immediately)
+- ❌ Skipping any team marked ⭕
+- ❌ Answering directly without calling teams
+
+[CRITICAL REMINDER]
+- You are a COORDINATOR, not an executor
+- Dispatch all independent teams together, then wait for their results
+"""
+        else:
+            # Enhanced system prompt with STRICT single tool call constraint
+            execution_mode = "SEQUENTIAL"
+
+            enhanced_prompt = f"""{config.system_prompt}
 
 ================================================================================
 CRITICAL INSTRUCTIONS - STRICT SEQUENTIAL EXECUTION
@@ -1045,12 +1193,14 @@ FAILURE CONDITIONS
             model = create_model_from_id(config.model_id, config.temperature, config.max_tokens)
 
         # 创建 Global Supervisor Agent
-        # 注意：并行/顺序执行主要通过系统提示词来引导 Agent 的行为
+        # 并行模式下同一响应中的多个团队调用并发执行；顺序模式下逐个执行
+        tool_executor = ConcurrentToolExecutor() if config.parallel_execution else SequentialToolExecutor()
         global_supervisor = Agent(
             system_prompt=enhanced_prompt,
             tools=team_tools,
             model=model,
-            callback_handler=global_callback_handler
+            callback_handler=global_callback_handler,
+            tool_executor=tool_executor
         )
 
         return global_supervisor, team_names
@@ -1130,6 +1280,67 @@ EXECUTION REMINDER
 # 配置构建器
 # ============================================================================
 
+def _build_team_config(
+    name: str,
+    system_prompt: str,
+    workers: List[Dict[str, Any]],
+    agent_id: str = "",
+    user_message: Optional[str] = None,
+    model: Optional[Any] = None,
+    prevent_duplicate: bool = True,
+    share_context: bool = False,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    model_id: Optional[str] = None
+) -> TeamConfig:
+    """
+    根据团队参数和 Worker 字典列表创建团队配置
+
+    参数含义同 HierarchyBuilder.add_team。
+
+    Returns:
+        TeamConfig 实例
+    """
+    # 创建 Worker 配置列表
+    worker_configs = []
+    for w in workers:
+        worker_agent_id = w.get('agent_id', '')
+        # 优先使用 agent_id，没有则生成确定性 ID
+        worker_id = worker_agent_id or generate_deterministic_id('worker', name, w['name'])
+        worker_configs.append(WorkerConfig(
+            name=w['name'],
+            role=w['role'],
+            system_prompt=w['system_prompt'],
+            id=worker_id,
+            agent_id=worker_agent_id,
+            user_message=w.get('user_message'),
+            tools=w.get('tools', []),
+            model=w.get('model'),
+            temperature=w.get('temperature', 0.7),
+            max_tokens=w.get('max_tokens', 2048),
+            model_id=w.get('model_id')
+        ))
+
+    # 团队 ID：优先使用 agent_id，没有则生成确定性 ID
+    team_id = agent_id or generate_deterministic_id('team', name)
+
+    # 创建团队配置
+    return TeamConfig(
+        name=name,
+        system_prompt=system_prompt,
+        workers=worker_configs,
+        id=team_id,
+        agent_id=agent_id,
+        user_message=user_message,
+        model=model,
+        prevent_duplicate=prevent_duplicate,
+        share_context=share_context,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        model_id=model_id
+    )
+
+
 class HierarchyBuilder:
     """
     层级团队构建器 - 提供流式 API 构建配置
@@ -1306,35 +1517,8 @@ class HierarchyBuilder:
         Returns:
             self（支持链式调用）
         """
-        # 创建 Worker 配置列表
-        worker_configs = []
-        for w in workers:
-            worker_agent_id = w.get('agent_id', '')
-            # 优先使用 agent_id，没有则生成确定性 ID
-            worker_id = worker_agent_id or generate_deterministic_id('worker', name, w['name'])
-            worker_configs.append(WorkerConfig(
-                name=w['name'],
-                role=w['role'],
-                system_prompt=w['system_prompt'],
-                id=worker_id,
-                agent_id=worker_agent_id,
-                user_message=w.get('user_message'),
-                tools=w.get('tools', []),
-                model=w.get('model'),
-                temperature=w.get('temperature', 0.7),
-                max_tokens=w.get('max_tokens', 2048),
-                model_id=w.get('model_id')
-            ))
-
-        # 团队 ID：优先使用 agent_id，没有则生成确定性 ID
-        team_id = agent_id or generate_deterministic_id('team', name)
-
-        # 创建团队配置
-        team_config = TeamConfig(
-            name=name,
-            system_prompt=system_prompt,
-            workers=worker_configs,
-            id=team_id,
+        self.teams.append(_build_team_config(
+            name, system_prompt, workers,
             agent_id=agent_id,
             user_message=user_message,
             model=model,
@@ -1343,9 +1527,7 @@ class HierarchyBuilder:
             temperature=temperature,
             max_tokens=max_tokens,
             model_id=model_id
-        )
-
-        self.teams.append(team_config)
+        ))
         return self
     
     def build(self) -> tuple[Agent, Optional[CallTracker], List[str]]:
@@ -1406,34 +1588,40 @@ def create_hierarchy_from_config(config: dict, enable_tracking: bool = True) ->
     global_agent = config.get('global_supervisor_agent', {})
     teams = config.get('teams', [])
 
-    builder = HierarchyBuilder(
-        enable_tracking=enable_tracking,
-        enable_context_sharing=enable_context_sharing,
-        parallel_execution=(execution_mode == 'parallel')
-    )
-
-    # 设置 Global Supervisor
-    builder.set_global_system_prompt(global_agent.get('system_prompt', ''))
-    if global_agent.get('agent_id'):
-        builder.set_global_agent_id(global_agent['agent_id'])
-    if global_agent.get('user_message'):
-        builder.set_global_user_message(global_agent['user_message'])
-
-    # 添加团队
+    # 配置一次性给定，直接构建配置对象（无需经过 HierarchyBuilder 的链式状态）
+    team_configs = []
     for team in teams:
         team_agent = team.get('team_supervisor_agent', {})
-        builder.add_team(
-            name=team['name'],
-            system_prompt=team_agent.get('system_prompt', ''),
-            workers=team.get('workers', []),
+        team_configs.append(_build_team_config(
+            team['name'],
+            team_agent.get('system_prompt', ''),
+            team.get('workers', []),
             agent_id=team_agent.get('agent_id', ''),
             user_message=team_agent.get('user_message'),
             model=team.get('model'),
             prevent_duplicate=team.get('prevent_duplicate', True),
             share_context=team.get('share_context', False)
-        )
+        ))
+
+    global_agent_id = global_agent.get('agent_id') or ''
+    global_config = GlobalConfig(
+        system_prompt=global_agent.get('system_prompt', ''),
+        teams=team_configs,
+        id=global_agent_id or generate_deterministic_id('global_supervisor'),
+        agent_id=global_agent_id,
+        user_message=global_agent.get('user_message') or None,
+        enable_tracking=enable_tracking,
+        enable_context_sharing=enable_context_sharing,
+        parallel_execution=(execution_mode == 'parallel')
+    )
+
+    # 仅在启用追踪时创建追踪器
+    tracker = CallTracker() if enable_tracking else None
+    if tracker:
+        WorkerAgentFactory.set_execution_tracker(tracker.execution_tracker)
 
-    return builder.build()
+    agent, team_names = GlobalSupervisorFactory.create_global_supervisor(global_config, tracker)
+    return agent, tracker, team_names
 
 
 # ============================================================================
@@ -8,17 +8,37 @@
 - [Team: 团队名 | Worker: 成员名] - 团队成员输出
 """
 
+import os
+import sys
+from contextvars import ContextVar
 from typing import List, Optional
 
 
+# 当前团队上下文（ContextVar：并行执行的团队各自独立，并随 asyncio 任务/to_thread 传递给 Worker）
+_current_team_name: ContextVar[Optional[str]] = ContextVar('current_team_name', default=None)
+
+# 预先生成的分隔线（与 OutputFormatter 的分隔符样式和长度一致）
+_SEPARATOR_LENGTH = 70
+_SEP_WORKER = "=" * _SEPARATOR_LENGTH
+_SEP_TEAM = "#" * _SEPARATOR_LENGTH
+_SEP_GLOBAL = "*" * _SEPARATOR_LENGTH
+_SEP_SECTION = "-" * _SEPARATOR_LENGTH
+
+
+def _truncate_text(text: str, max_length: int = 100) -> str:
+    """截断文本"""
+    return f"{text[:max_length]}..." if len(text) > max_length else text
+
+
 class OutputFormatter:
     """输出格式化器 - 统一管理所有输出样式"""
 
     # 全局开关：是否启用 print 输出（设为 False 禁用所有状态输出，只保留 LLM 输出）
-    PRINT_ENABLED = False
+    # 默认关闭，可通过环境变量 HIERARCHY_VERBOSE=1 开启；关闭时各 print_* 在构建任何字符串前直接返回
+    PRINT_ENABLED = os.environ.get('HIERARCHY_VERBOSE', '').lower() in ('true', '1', 'yes')
 
     # 分隔符长度
-    SEPARATOR_LENGTH = 70
+    SEPARATOR_LENGTH = _SEPARATOR_LENGTH
 
     # 分隔符样式
     SEPARATOR_WORKER = "="
@@ -26,18 +46,15 @@ class OutputFormatter:
     SEPARATOR_GLOBAL = "*"
     SEPARATOR_SECTION = "-"
 
-    # 当前上下文（用于标注输出来源）
-    _current_team_name: Optional[str] = None
-
     @classmethod
     def set_current_team(cls, team_name: Optional[str]):
         """设置当前团队上下文"""
-        cls._current_team_name = team_name
+        _current_team_name.set(team_name)
 
     @classmethod
     def get_current_team(cls) -> Optional[str]:
         """获取当前团队上下文"""
-        return cls._current_team_name
+        return _current_team_name.get()
 
     @staticmethod
     def format_source_label(source_type: str, name: str = None, team_name: str = None, agent_id: str = None) -> str:
@@ -62,8 +79,8 @@ class OutputFormatter:
         elif source_type == 'worker':
             if team_name:
                 return f"[Team: {team_name} | Worker: {name}{id_suffix}]"
-            elif OutputFormatter._current_team_name:
-                return f"[Team: {OutputFormatter._current_team_name} | Worker: {name}{id_suffix}]"
+            elif current_team := OutputFormatter.get_current_team():
+                return f"[Team: {current_team} | Worker: {name}{id_suffix}]"
             else:
                 return f"[Worker: {name}{id_suffix}]"
         return ""
@@ -91,13 +108,14 @@ class OutputFormatter:
     def _print_separator(char: str, length: int = SEPARATOR_LENGTH):
         """打印分隔符"""
         print(char * length)
-    
+
     @staticmethod
-    def _truncate_text(text: str, max_length: int = 100) -> str:
-        """截断文本"""
-        if len(text) > max_length:
-            return f"{text[:max_length]}..."
-        return text
+    def _emit(*lines: str):
+        """输出多行文本（合并为一次 write，与逐行 print 输出一致）"""
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    # 截断文本（模块级函数的别名，保留原有调用方式）
+    _truncate_text = staticmethod(_truncate_text)
     
     # ========================================================================
     # Worker Agent 输出
@@ -109,11 +127,13 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('worker', name, team_name, agent_id=agent_id)
-        print(f"\n{OutputFormatter.SEPARATOR_WORKER * OutputFormatter.SEPARATOR_LENGTH}")
-        print(f"{label} 🔬 开始工作")
-        print(OutputFormatter.SEPARATOR_WORKER * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"📋 任务: {OutputFormatter._truncate_text(task)}")
-        print(f"{OutputFormatter.SEPARATOR_WORKER * OutputFormatter.SEPARATOR_LENGTH}\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_WORKER}",
+            f"{label} 🔬 开始工作",
+            _SEP_WORKER,
+            f"📋 任务: {_truncate_text(task)}",
+            f"{_SEP_WORKER}\n"
+        )
 
     @staticmethod
     def print_worker_thinking(name: str, team_name: str = None, agent_id: str = None):
@@ -121,8 +141,10 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('worker', name, team_name, agent_id=agent_id)
-        print(f"\n{label} 💭 思考中...\n")
-        print(OutputFormatter.SEPARATOR_SECTION * OutputFormatter.SEPARATOR_LENGTH + "\n")
+        OutputFormatter._emit(
+            f"\n{label} 💭 思考中...\n",
+            f"{_SEP_SECTION}\n"
+        )
 
     @staticmethod
     def print_worker_complete(name: str, team_name: str = None, agent_id: str = None):
@@ -130,17 +152,21 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('worker', name, team_name, agent_id=agent_id)
-        print("\n" + OutputFormatter.SEPARATOR_SECTION * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"\n{label} ✅ 完成工作\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_SECTION}",
+            f"\n{label} ✅ 完成工作\n"
+        )
 
     @staticmethod
     def print_worker_warning(message: str):
         """打印 Worker 警告信息"""
         if not OutputFormatter.PRINT_ENABLED:
             return
-        print(f"\n{OutputFormatter.SEPARATOR_WORKER * OutputFormatter.SEPARATOR_LENGTH}")
-        print(message)
-        print(f"{OutputFormatter.SEPARATOR_WORKER * OutputFormatter.SEPARATOR_LENGTH}\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_WORKER}",
+            message,
+            f"{_SEP_WORKER}\n"
+        )
 
     @staticmethod
     def print_worker_duplicate_task_warning(name: str, team_name: str = None):
@@ -148,14 +174,14 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('worker', name, team_name)
-        print(f"\n⚠️ {label} 该专家已经处理过此任务，请直接使用之前的结果\n")
+        OutputFormatter._emit(f"\n⚠️ {label} 该专家已经处理过此任务，请直接使用之前的结果\n")
 
     @staticmethod
     def print_worker_error(message: str):
         """打印 Worker 错误信息"""
         if not OutputFormatter.PRINT_ENABLED:
             return
-        print(f"\n❌ {message}\n")
+        OutputFormatter._emit(f"\n❌ {message}\n")
     
     # ========================================================================
     # Team Supervisor 输出
@@ -169,13 +195,15 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('team_supervisor', name, agent_id=agent_id)
-        print(f"\n{OutputFormatter.SEPARATOR_TEAM * OutputFormatter.SEPARATOR_LENGTH}")
-        print(f"{label} 👔 开始协调")
-        print(OutputFormatter.SEPARATOR_TEAM * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"📌 调用ID: {call_id}")
-        print(f"📋 任务: {OutputFormatter._truncate_text(task)}")
-        print(f"👥 团队成员: {', '.join(workers)}")
-        print(f"{OutputFormatter.SEPARATOR_TEAM * OutputFormatter.SEPARATOR_LENGTH}\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_TEAM}",
+            f"{label} 👔 开始协调",
+            _SEP_TEAM,
+            f"📌 调用ID: {call_id}",
+            f"📋 任务: {_truncate_text(task)}",
+            f"👥 团队成员: {', '.join(workers)}",
+            f"{_SEP_TEAM}\n"
+        )
 
     @staticmethod
     def print_team_thinking(name: str, agent_id: str = None):
@@ -183,8 +211,10 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('team_supervisor', name, agent_id=agent_id)
-        print(f"\n{label} 💭 思考中...\n")
-        print(OutputFormatter.SEPARATOR_SECTION * OutputFormatter.SEPARATOR_LENGTH + "\n")
+        OutputFormatter._emit(
+            f"\n{label} 💭 思考中...\n",
+            f"{_SEP_SECTION}\n"
+        )
 
     @staticmethod
     def print_team_complete(name: str, agent_id: str = None):
@@ -194,8 +224,10 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('team_supervisor', name, agent_id=agent_id)
-        print("\n" + OutputFormatter.SEPARATOR_SECTION * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"\n{label} ✅ 完成协调\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_SECTION}",
+            f"\n{label} ✅ 完成协调\n"
+        )
 
     @staticmethod
     def print_team_summary(name: str, agent_id: str = None):
@@ -203,30 +235,32 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('team_supervisor', name, agent_id=agent_id)
-        print(f"\n{label} 📝 总结:\n")
+        OutputFormatter._emit(f"\n{label} 📝 总结:\n")
 
     @staticmethod
     def print_team_warning(message: str):
         """打印 Team Supervisor 警告信息"""
         if not OutputFormatter.PRINT_ENABLED:
             return
-        print(f"\n{OutputFormatter.SEPARATOR_TEAM * OutputFormatter.SEPARATOR_LENGTH}")
-        print(message)
-        print(f"{OutputFormatter.SEPARATOR_TEAM * OutputFormatter.SEPARATOR_LENGTH}\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_TEAM}",
+            message,
+            f"{_SEP_TEAM}\n"
+        )
 
     @staticmethod
     def print_team_error(message: str):
         """打印 Team Supervisor 错误信息"""
         if not OutputFormatter.PRINT_ENABLED:
             return
-        print(f"\n❌ {message}\n")
+        OutputFormatter._emit(f"\n❌ {message}\n")
 
     @staticmethod
     def print_team_duplicate_warning(message: str):
         """打印 Team Supervisor 重复调用警告"""
         if not OutputFormatter.PRINT_ENABLED:
             return
-        print(f"\n⚠️  {message}\n")
+        OutputFormatter._emit(f"\n⚠️  {message}\n")
 
     @staticmethod
     def print_team_dispatch(team_name: str, worker_name: str, agent_id: str = None):
@@ -234,8 +268,7 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('team_supervisor', team_name, agent_id=agent_id)
-        print(f"\n{label} 📤 DISPATCH: 调度 [{worker_name}]")
-        print("")
+        OutputFormatter._emit(f"\n{label} 📤 DISPATCH: 调度 [{worker_name}]\n")
 
     # ========================================================================
     # Global Supervisor 输出
@@ -247,11 +280,13 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('global', agent_id=agent_id)
-        print(f"\n{OutputFormatter.SEPARATOR_GLOBAL * OutputFormatter.SEPARATOR_LENGTH}")
-        print(f"{label} 🎯 开始分析任务")
-        print(OutputFormatter.SEPARATOR_GLOBAL * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"📋 任务:\n{task}")
-        print(f"{OutputFormatter.SEPARATOR_GLOBAL * OutputFormatter.SEPARATOR_LENGTH}\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_GLOBAL}",
+            f"{label} 🎯 开始分析任务",
+            _SEP_GLOBAL,
+            f"📋 任务:\n{task}",
+            f"{_SEP_GLOBAL}\n"
+        )
 
     @staticmethod
     def print_global_thinking(agent_id: str = None):
@@ -259,8 +294,10 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('global', agent_id=agent_id)
-        print(f"\n{label} 💭 思考中...\n")
-        print(OutputFormatter.SEPARATOR_SECTION * OutputFormatter.SEPARATOR_LENGTH + "\n")
+        OutputFormatter._emit(
+            f"\n{label} 💭 思考中...\n",
+            f"{_SEP_SECTION}\n"
+        )
 
     @staticmethod
     def print_global_dispatch(team_name: str, reason: str = "", agent_id: str = None):
@@ -268,10 +305,10 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('global', agent_id=agent_id)
-        print(f"\n{label} 📤 DISPATCH: 调度 [{team_name}]")
         if reason:
-            print(f"   理由: {reason}")
-        print("")
+            OutputFormatter._emit(f"\n{label} 📤 DISPATCH: 调度 [{team_name}]", f"   理由: {reason}\n")
+        else:
+            OutputFormatter._emit(f"\n{label} 📤 DISPATCH: 调度 [{team_name}]\n")
 
     @staticmethod
     def print_global_summary(agent_id: str = None):
@@ -279,7 +316,7 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('global', agent_id=agent_id)
-        print(f"\n{label} 📝 SYNTHESIS: 总结所有团队结果...\n")
+        OutputFormatter._emit(f"\n{label} 📝 SYNTHESIS: 总结所有团队结果...\n")
 
     @staticmethod
     def print_global_complete(agent_id: str = None):
@@ -287,105 +324,42 @@ class OutputFormatter:
         if not OutputFormatter.PRINT_ENABLED:
             return
         label = OutputFormatter.format_source_label('global', agent_id=agent_id)
-        print("\n" + OutputFormatter.SEPARATOR_GLOBAL * OutputFormatter.SEPARATOR_LENGTH)
-        print(f"\n{label} ✅ 完成任务\n")
+        OutputFormatter._emit(
+            f"\n{_SEP_GLOBAL}",
+            f"\n{label} ✅ 完成任务\n"
+        )
 
 
 # ============================================================================
 # 便捷函数（向后兼容）
 # ============================================================================
+# 直接绑定到 OutputFormatter 的静态方法，调用时不再多一层转发函数
 
 # Worker 输出
-def print_worker_start(name: str, task: str, team_name: str = None, agent_id: str = None):
-    """打印 Worker 开始工作"""
-    OutputFormatter.print_worker_start(name, task, team_name, agent_id=agent_id)
-
-
-def print_worker_thinking(name: str, team_name: str = None, agent_id: str = None):
-    """打印 Worker 思考过程标题"""
-    OutputFormatter.print_worker_thinking(name, team_name, agent_id=agent_id)
-
-
-def print_worker_complete(name: str, team_name: str = None, agent_id: str = None):
-    """打印 Worker 完成工作"""
-    OutputFormatter.print_worker_complete(name, team_name, agent_id=agent_id)
-
-
-def print_worker_warning(message: str):
-    """打印 Worker 警告信息"""
-    OutputFormatter.print_worker_warning(message)
-
-
-def print_worker_error(message: str):
-    """打印 Worker 错误信息"""
-    OutputFormatter.print_worker_error(message)
+print_worker_start = OutputFormatter.print_worker_start
+print_worker_thinking = OutputFormatter.print_worker_thinking
+print_worker_complete = OutputFormatter.print_worker_complete
+print_worker_warning = OutputFormatter.print_worker_warning
+print_worker_error = OutputFormatter.print_worker_error
 
 
 # Team 输出
-def print_team_start(name: str, call_id: str, task: str, workers: List[str], agent_id: str = None):
-    """打印 Team Supervisor 开始协调"""
-    OutputFormatter.print_team_start(name, call_id, task, workers, agent_id=agent_id)
-
-
-def print_team_thinking(name: str, agent_id: str = None):
-    """打印 Team Supervisor 思考过程标题"""
-    OutputFormatter.print_team_thinking(name, agent_id=agent_id)
-
-
-def print_team_complete(name: str, agent_id: str = None):
-    """打印 Team Supervisor 完成协调"""
-    OutputFormatter.print_team_complete(name, agent_id=agent_id)
-
-
-def print_team_summary(name: str, agent_id: str = None):
-    """打印 Team Supervisor 总结"""
-    OutputFormatter.print_team_summary(name, agent_id=agent_id)
-
-
-def print_team_warning(message: str):
-    """打印 Team Supervisor 警告信息"""
-    OutputFormatter.print_team_warning(message)
-
-
-def print_team_error(message: str):
-    """打印 Team Supervisor 错误信息"""
-    OutputFormatter.print_team_error(message)
-
-
-def print_team_duplicate_warning(message: str):
-    """打印 Team Supervisor 重复调用警告"""
-    OutputFormatter.print_team_duplicate_warning(message)
-
-
-def print_team_dispatch(team_name: str, worker_name: str, agent_id: str = None):
-    """打印 Team Supervisor 调度 Worker"""
-    OutputFormatter.print_team_dispatch(team_name, worker_name, agent_id=agent_id)
+print_team_start = OutputFormatter.print_team_start
+print_team_thinking = OutputFormatter.print_team_thinking
+print_team_complete = OutputFormatter.print_team_complete
+print_team_summary = OutputFormatter.print_team_summary
+print_team_warning = OutputFormatter.print_team_warning
+print_team_error = OutputFormatter.print_team_error
+print_team_duplicate_warning = OutputFormatter.print_team_duplicate_warning
+print_team_dispatch = OutputFormatter.print_team_dispatch
 
 
 # Global 输出
-def print_global_start(task: str, agent_id: str = None):
-    """打印 Global Supervisor 开始分析"""
-    OutputFormatter.print_global_start(task, agent_id=agent_id)
-
-
-def print_global_thinking(agent_id: str = None):
-    """打印 Global Supervisor 思考过程标题"""
-    OutputFormatter.print_global_thinking(agent_id=agent_id)
-
-
-def print_global_dispatch(team_name: str, reason: str = "", agent_id: str = None):
-    """打印 Global Supervisor 调度团队"""
-    OutputFormatter.print_global_dispatch(team_name, reason, agent_id=agent_id)
-
-
-def print_global_summary(agent_id: str = None):
-    """打印 Global Supervisor 总结"""
-    OutputFormatter.print_global_summary(agent_id=agent_id)
-
-
-def print_global_complete(agent_id: str = None):
-    """打印 Global Supervisor 完成分析"""
-    OutputFormatter.print_global_complete(agent_id=agent_id)
+print_global_start = OutputFormatter.print_global_start
+print_global_thinking = OutputFormatter.print_global_thinking
+print_global_dispatch = OutputFormatter.print_global_dispatch
+print_global_summary = OutputFormatter.print_global_summary
+print_global_complete = OutputFormatter.print_global_complete
 
 
 # 上下文管理
@@ -395,16 +369,6 @@ def set_current_team(team_name: str = None):
 
 
 # 消息生成函数
-def format_executed_message(name: str) -> str:
-    """生成"已执行过"的返回消息"""
-    return OutputFormatter.format_executed_message(name)
-
-
-def format_duplicate_task_message(name: str) -> str:
-    """生成"重复任务"的返回消息"""
-    return OutputFormatter.format_duplicate_task_message(name)
-
-
-def format_result_message(name: str, response: str) -> str:
-    """生成结果消息"""
-    return OutputFormatter.format_result_message(name, response)
+format_executed_message = OutputFormatter.format_executed_message
+format_duplicate_task_message = OutputFormatter.format_duplicate_task_message
+format_result_message = OutputFormatter.format_result_message
@@ -6,7 +6,8 @@ import os
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Column, create_engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session, scoped_session
 
 from .models import Base
@@ -151,3 +152,28 @@ def close_db():
         db.remove()
     if _engine:
         _engine.dispose()
+
+
+def is_unique_violation(error: IntegrityError, column: Column) -> bool:
+    """
+    判断 IntegrityError 是否由指定列的 UNIQUE 约束触发
+
+    兼容 MySQL (PyMySQL)、PostgreSQL 与 SQLite，其他约束（如 NOT NULL）返回 False。
+    """
+    table, name = column.table.name, column.name
+    orig = error.orig
+
+    # PostgreSQL: SQLSTATE 23505，默认约束名为 <table>_<column>_key
+    sqlstate = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if sqlstate is not None:
+        constraint = getattr(getattr(orig, 'diag', None), 'constraint_name', None)
+        return sqlstate == '23505' and constraint == f'{table}_{name}_key'
+
+    # MySQL: errno 1062 "Duplicate entry '...' for key 'name'"（8.0.19+ 为 'table.name'）
+    args = getattr(orig, 'args', ())
+    if args and isinstance(args[0], int):
+        message = str(args[1]) if len(args) > 1 else ''
+        return args[0] == 1062 and message.endswith((f"key '{name}'", f"key '{table}.{name}'"))
+
+    # SQLite: "UNIQUE constraint failed: table.name"
+    return f'UNIQUE constraint failed: {table}.{name}' in str(orig)
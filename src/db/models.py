@@ -5,8 +5,9 @@ Database Models - SQLAlchemy 数据库模型定义
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
+import orjson
 from sqlalchemy import (
     Column, String, Float, Integer, BigInteger, Boolean, DateTime,
     Text, JSON, ForeignKey, Enum as SQLEnum
@@ -97,6 +98,48 @@ class HierarchyTeam(Base):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
+    def iter_json_chunks(self) -> Iterator[bytes]:
+        """
+        分段生成与 orjson.dumps(to_dict()) 完全一致的 JSON 字节串
+
+        除 config.teams 外的字段在调用时立即序列化（出错可被调用方捕获），
+        teams 逐个团队惰性序列化，峰值内存为单个团队而非整个层级。
+        """
+        config = self.config
+        teams = config.get('teams') if isinstance(config, dict) else None
+        if not isinstance(teams, list):
+            # config 非 dict 或不含 teams 数组时无需分段，整体序列化
+            return iter((orjson.dumps(self.to_dict()),))
+
+        keys = list(config)
+        split = keys.index('teams')
+        before = orjson.dumps({k: config[k] for k in keys[:split]})[1:-1]
+        after = orjson.dumps({k: config[k] for k in keys[split + 1:]})[1:-1]
+        head = orjson.dumps({
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+        })[:-1]
+        tail = orjson.dumps({
+            'is_active': self.is_active,
+            'version': self.version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        })[1:]
+
+        # head 去掉末尾的 "}"，tail 去掉开头的 "{"，中间按原键序拼接 config
+        config_head = head + b',"config":{' + before + (b',' if before else b'') + b'"teams":['
+        config_tail = b']' + (b',' + after if after else b'') + b'},' + tail
+        return self._iter_team_chunks(config_head, teams, config_tail)
+
+    @staticmethod
+    def _iter_team_chunks(config_head: bytes, teams: list, config_tail: bytes) -> Iterator[bytes]:
+        """惰性输出 teams 数组（头尾片段已预先序列化）"""
+        yield config_head
+        for index, team in enumerate(teams):
+            yield (b',' if index else b'') + orjson.dumps(team)
+        yield config_tail
+
     def to_execution_config(self) -> dict:
         """转换为执行配置格式"""
         return self.config
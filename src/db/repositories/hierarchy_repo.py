@@ -4,8 +4,11 @@ Hierarchy Repository - 层级团队数据访问层
 
 import uuid
 from typing import List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..database import is_unique_violation
 from ..models import HierarchyTeam
 
 
@@ -79,6 +82,17 @@ def ensure_agent_ids(config: dict) -> dict:
     return config
 
 
+def _team_count_expr(dialect_name: str):
+    """config.teams 数组长度的 SQL 表达式（按数据库方言选择 JSON 函数）"""
+    if dialect_name == 'postgresql':
+        count = func.json_array_length(HierarchyTeam.config['teams'])
+    elif dialect_name == 'sqlite':
+        count = func.json_array_length(HierarchyTeam.config, '$.teams')
+    else:
+        count = func.json_length(HierarchyTeam.config, '$.teams')
+    return func.coalesce(count, 0)
+
+
 class HierarchyRepository:
     """层级团队仓库"""
 
@@ -107,6 +121,26 @@ class HierarchyRepository:
         self.session.refresh(hierarchy)
         return hierarchy
 
+    def create_if_unique_name(
+        self,
+        name: str,
+        description: Optional[str],
+        config: dict
+    ) -> Tuple[Optional[HierarchyTeam], bool]:
+        """
+        创建层级团队，名称唯一性由 UNIQUE 约束保证（无需预先查询）
+
+        Returns:
+            (层级团队, 是否创建成功)，名称已存在时返回 (None, False)；其他约束错误直接抛出
+        """
+        try:
+            return self.create(name, description, config), True
+        except IntegrityError as e:
+            self.session.rollback()
+            if not is_unique_violation(e, HierarchyTeam.__table__.c.name):
+                raise
+            return None, False
+
     def get_by_id(self, hierarchy_id: str) -> Optional[HierarchyTeam]:
         """根据 ID 获取层级团队"""
         return self.session.query(HierarchyTeam) \
@@ -144,6 +178,57 @@ class HierarchyRepository:
 
         return hierarchies, total
 
+    def list_summary(
+        self,
+        page: int = 1,
+        size: int = 20,
+        is_active: Optional[bool] = None
+    ) -> tuple[List[dict], int]:
+        """
+        获取层级团队列表摘要
+
+        单条列投影查询，不加载 config JSON、不构建 ORM 对象；
+        执行模式和团队数量在数据库端从 config 中提取。
+
+        Returns:
+            (摘要字典列表, 总数)
+        """
+        dialect_name = self.session.get_bind().dialect.name
+        stmt = select(
+            HierarchyTeam.id,
+            HierarchyTeam.name,
+            HierarchyTeam.description,
+            func.coalesce(
+                HierarchyTeam.config['execution_mode'].as_string(), 'sequential'
+            ).label('execution_mode'),
+            _team_count_expr(dialect_name).label('team_count'),
+            HierarchyTeam.is_active,
+            HierarchyTeam.version,
+            HierarchyTeam.created_at,
+            HierarchyTeam.updated_at,
+        )
+        count_stmt = select(func.count()).select_from(HierarchyTeam)
+
+        if is_active is not None:
+            stmt = stmt.where(HierarchyTeam.is_active == is_active)
+            count_stmt = count_stmt.where(HierarchyTeam.is_active == is_active)
+
+        total = self.session.execute(count_stmt).scalar()
+        rows = self.session.execute(
+            stmt.order_by(HierarchyTeam.created_at.desc())
+                .offset((page - 1) * size)
+                .limit(size)
+        )
+
+        items = []
+        for row in rows:
+            item = dict(row._mapping)
+            item['created_at'] = item['created_at'].isoformat() if item['created_at'] else None
+            item['updated_at'] = item['updated_at'].isoformat() if item['updated_at'] else None
+            items.append(item)
+
+        return items, total
+
     def update(self, hierarchy_id: str, data: dict) -> Optional[HierarchyTeam]:
         """
         更新层级团队
@@ -174,6 +259,25 @@ class HierarchyRepository:
         self.session.refresh(hierarchy)
         return hierarchy
 
+    def update_if_unique_name(
+        self,
+        hierarchy_id: str,
+        data: dict
+    ) -> Tuple[Optional[HierarchyTeam], bool]:
+        """
+        更新层级团队，名称唯一性由 UNIQUE 约束保证（无需预先查询）
+
+        Returns:
+            (层级团队, 名称是否可用)，层级不存在时返回 (None, True)，名称冲突时返回 (None, False)；其他约束错误直接抛出
+        """
+        try:
+            return self.update(hierarchy_id, data), True
+        except IntegrityError as e:
+            self.session.rollback()
+            if not is_unique_violation(e, HierarchyTeam.__table__.c.name):
+                raise
+            return None, False
+
     def delete(self, hierarchy_id: str) -> bool:
         """删除层级团队"""
         hierarchy = self.get_by_id(hierarchy_id)
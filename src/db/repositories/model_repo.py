@@ -2,9 +2,12 @@
 Model Repository - AI 模型数据访问层
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import exists, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..database import is_unique_violation
 from ..models import AIModel
 
 
@@ -18,10 +21,31 @@ class ModelRepository:
         """创建模型"""
         model = AIModel(**data)
         self.session.add(model)
-        self.session.commit()
-        self.session.refresh(model)
+        # AIModel 的默认值均在 Python 侧生成，INSERT 后对象属性已完整，
+        # 提交时不使其过期，省去提交后重新加载（refresh）的 SELECT
+        expire_on_commit = self.session.expire_on_commit
+        self.session.expire_on_commit = False
+        try:
+            self.session.commit()
+        finally:
+            self.session.expire_on_commit = expire_on_commit
         return model
 
+    def create_if_unique_name(self, data: dict) -> Tuple[Optional[AIModel], bool]:
+        """
+        创建模型，名称唯一性由 UNIQUE 约束保证（无需预先查询）
+
+        Returns:
+            (模型, 是否创建成功)，名称已存在时返回 (None, False)；其他约束错误直接抛出
+        """
+        try:
+            return self.create(data), True
+        except IntegrityError as e:
+            self.session.rollback()
+            if not is_unique_violation(e, AIModel.__table__.c.name):
+                raise
+            return None, False
+
     def get_by_id(self, model_id: str) -> Optional[AIModel]:
         """根据 ID 获取模型"""
         return self.session.query(AIModel).filter(AIModel.id == model_id).first()
@@ -42,43 +66,111 @@ class ModelRepository:
         Returns:
             (模型列表, 总数)
         """
-        query = self.session.query(AIModel)
+        # 窗口函数在同一查询中返回总数，省去单独的 COUNT 查询
+        query = self.session.query(AIModel, func.count().over().label('total'))
 
         if is_active is not None:
             query = query.filter(AIModel.is_active == is_active)
 
-        total = query.count()
-        models = query.order_by(AIModel.created_at.desc()) \
-                     .offset((page - 1) * size) \
-                     .limit(size) \
-                     .all()
+        rows = query.order_by(AIModel.created_at.desc()) \
+                    .offset((page - 1) * size) \
+                    .limit(size) \
+                    .all()
 
+        models = [row[0] for row in rows]
+        total = rows[0].total if rows else self._count_for_empty_page(page, is_active)
         return models, total
 
+    def _count_for_empty_page(self, page: int, is_active: Optional[bool]) -> int:
+        """
+        当前页无数据时的总数（窗口函数无行可返回）
+
+        第一页为空说明没有数据；超出末页时才需要单独统计总数。
+        """
+        if page <= 1:
+            return 0
+        count_stmt = select(func.count()).select_from(AIModel)
+        if is_active is not None:
+            count_stmt = count_stmt.where(AIModel.is_active == is_active)
+        return self.session.execute(count_stmt).scalar()
+
+    def list_summary(
+        self,
+        page: int = 1,
+        size: int = 20,
+        is_active: Optional[bool] = None
+    ) -> tuple[List[dict], int]:
+        """
+        获取模型列表（列投影查询，不构建 ORM 对象）
+
+        Returns:
+            (模型字典列表, 总数)
+        """
+        # 窗口函数在同一查询中返回总数，省去单独的 COUNT 查询
+        stmt = select(*AIModel.__table__.columns, func.count().over().label('_total'))
+
+        if is_active is not None:
+            stmt = stmt.where(AIModel.is_active == is_active)
+
+        rows = self.session.execute(
+            stmt.order_by(AIModel.created_at.desc())
+                .offset((page - 1) * size)
+                .limit(size)
+        ).all()
+
+        total = rows[0]._total if rows else self._count_for_empty_page(page, is_active)
+
+        items = []
+        for row in rows:
+            item = dict(row._mapping)
+            del item['_total']
+            item['created_at'] = item['created_at'].isoformat() if item['created_at'] else None
+            item['updated_at'] = item['updated_at'].isoformat() if item['updated_at'] else None
+            items.append(item)
+
+        return items, total
+
     def update(self, model_id: str, data: dict) -> Optional[AIModel]:
-        """更新模型"""
-        model = self.get_by_id(model_id)
-        if not model:
+        """更新模型（单条 UPDATE 语句，无需先加载再修改）"""
+        values = {
+            key: value for key, value in data.items()
+            if hasattr(AIModel, key) and key not in ('id', 'created_at')
+        }
+        if not values:
+            return self.get_by_id(model_id)
+
+        updated = self.session.query(AIModel) \
+                      .filter(AIModel.id == model_id) \
+                      .update(values, synchronize_session=False)
+        self.session.commit()
+        if not updated:
             return None
+        # 提交后会话中的对象已过期，这里读取的是更新后的数据
+        return self.get_by_id(model_id)
 
-        for key, value in data.items():
-            if hasattr(model, key) and key not in ('id', 'created_at'):
-                setattr(model, key, value)
+    def update_if_unique_name(self, model_id: str, data: dict) -> Tuple[Optional[AIModel], bool]:
+        """
+        更新模型，名称唯一性由 UNIQUE 约束保证（无需预先查询）
 
-        self.session.commit()
-        self.session.refresh(model)
-        return model
+        Returns:
+            (模型, 名称是否可用)，模型不存在时返回 (None, True)，名称冲突时返回 (None, False)；其他约束错误直接抛出
+        """
+        try:
+            return self.update(model_id, data), True
+        except IntegrityError as e:
+            self.session.rollback()
+            if not is_unique_violation(e, AIModel.__table__.c.name):
+                raise
+            return None, False
 
     def delete(self, model_id: str) -> bool:
-        """删除模型"""
-        model = self.get_by_id(model_id)
-        if not model:
-            return False
-
-        self.session.delete(model)
+        """删除模型（单条 DELETE 语句）"""
+        deleted = self.session.query(AIModel) \
+                      .filter(AIModel.id == model_id) \
+                      .delete(synchronize_session=False)
         self.session.commit()
-        return True
+        return deleted > 0
 
     def exists(self, model_id: str) -> bool:
         """检查模型是否存在"""
-        return self.session.query(AIModel).filter(AIModel.id == model_id).count() > 0
+        return self.session.query(exists().where(AIModel.id == model_id)).scalar()
@@ -6,11 +6,30 @@ Standalone HTTP Server - 独立的 HTTP 服务器应用
 """
 
 import os
+import orjson
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flasgger import Swagger
 
 
+class OrJSONProvider(DefaultJSONProvider):
+    """基于 orjson 的 JSON 序列化（替代 Flask 默认的纯 Python json.dumps）"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        # datetime 交给 Flask 的 default 处理（保持 RFC 822 http_date 格式）
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        # orjson 无法处理的类型交给 Flask 默认的 default 处理
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 def convert_paths_to_openapi3(swagger_paths: dict) -> dict:
     """
     将 Swagger 2.0 的 paths 转换为 OpenAPI 3.0 格式
@@ -125,6 +144,7 @@ def create_app(config_name: str = None) -> Flask:
         Flask 应用实例
     """
     app = Flask(__name__)
+    app.json = OrJSONProvider(app)
 
     # 加载配置
     app.config['DATABASE_URL'] = os.environ.get('DATABASE_URL')
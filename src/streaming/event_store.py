@@ -28,7 +28,7 @@ STREAM_MAXLEN = 10000  # 单个运行最多保留 10000 条事件
 STREAM_TTL_SECONDS = 86400  # 24 小时后自动删除
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """Redis Stream 事件"""
     id: str                          # Redis 消息 ID
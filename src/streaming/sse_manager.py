@@ -4,17 +4,30 @@ SSE Manager - Server-Sent Events 管理器
 支持双写策略：同时写入内存队列（低延迟 SSE）和 Redis Stream（持久化+断线恢复）。
 """
 
-import json
 import threading
-from queue import Queue, Empty
-from datetime import datetime
+import time
+from collections import deque
 from typing import Generator, Optional, Dict, List
 
+import orjson
 from flask import Response
 
 from .event_store import EventStore, StreamEvent, get_event_store
 
 
+def _dumps(obj) -> str:
+    """序列化 SSE 事件数据（orjson：紧凑输出，非 ASCII 字符原样保留）"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+# 关闭事件帧（close() 放入队列的哨兵，generate_events 按对象身份识别）
+_CLOSE_FRAME = f"event: close\ndata: {_dumps({'message': 'Stream closed'})}\n\n"
+
+# 单次 yield 合并的最大帧数 / 字节数（突发事件合并发送，减少 WSGI 写入和分块编码次数）
+_BATCH_MAX_FRAMES = 16
+_BATCH_MAX_CHARS = 32 * 1024
+
+
 class SSEManager:
     """
     SSE 管理器 - 管理服务器发送事件
@@ -40,12 +53,17 @@ class SSEManager:
             event_store: EventStore 实例，如果未提供则使用全局实例
         """
         self.run_id = run_id
-        self.event_queue: Queue = Queue()
+        # 单生产者/单消费者的帧缓冲：deque 的 append/popleft 本身是原子操作，
+        # 仅在缓冲为空时通过 Event 等待唤醒
+        self.event_queue: deque = deque()
+        self._wake = threading.Event()
         self.is_active = True
         self._lock = threading.Lock()
         self._sequence = 0
         self._event_store = event_store
         self._last_event_id: Optional[str] = None  # 最后一个事件的 Redis 消息 ID
+        # 时间戳缓存 (毫秒数, 格式化字符串)：同一毫秒内的事件复用格式化结果
+        self._ts_cache: tuple = (0, "")
 
     @property
     def event_store(self) -> EventStore:
@@ -54,6 +72,18 @@ class SSEManager:
             self._event_store = get_event_store()
         return self._event_store
 
+    def _timestamp(self) -> str:
+        """生成毫秒精度的 ISO 8601 UTC 时间戳（同一毫秒内复用已格式化的字符串）"""
+        now_ms = time.time_ns() // 1_000_000
+        cached_ms, cached_str = self._ts_cache
+        if now_ms == cached_ms:
+            return cached_str
+        seconds, millis = divmod(now_ms, 1000)
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S.', time.gmtime(seconds)) + f'{millis:03d}Z'
+        # 以元组整体替换，保证多线程下毫秒数与字符串始终匹配
+        self._ts_cache = (now_ms, timestamp)
+        return timestamp
+
     def emit(self, event_data: Dict) -> Optional[str]:
         """
         发射事件（双写：内存队列 + Redis Stream）
@@ -68,8 +98,7 @@ class SSEManager:
             return None
 
         # 生成毫秒精度的 ISO 8601 时间戳
-        now = datetime.utcnow()
-        timestamp = now.strftime('%Y-%m-%dT%H:%M:%S.') + f'{now.microsecond // 1000:03d}Z'
+        timestamp = self._timestamp()
 
         # 自增序列号
         with self._lock:
@@ -102,8 +131,9 @@ class SSEManager:
             'data': data
         }
 
-        # 写入内存队列（低延迟 SSE）
-        self.event_queue.put(full_event)
+        # 写入内存队列（低延迟 SSE）：在生产者侧完成序列化，队列中保存可直接发送的 SSE 帧
+        self.event_queue.append(self._format_dict_event(full_event))
+        self._wake.set()
 
         # 更新最后事件 ID
         if message_id:
@@ -116,10 +146,8 @@ class SSEManager:
         with self._lock:
             self.is_active = False
             # 发送结束事件
-            self.event_queue.put({
-                'event': {'category': 'system', 'action': 'close'},
-                'data': {'message': 'Stream closed'}
-            })
+            self.event_queue.append(_CLOSE_FRAME)
+            self._wake.set()
 
     def generate_events(
         self,
@@ -139,48 +167,67 @@ class SSEManager:
         # 先发送初始事件（断线重连恢复的历史事件）
         if initial_events:
             for event in initial_events:
-                yield from self._format_stream_event(event)
+                yield self._format_stream_event(event)
 
         heartbeat_interval = 15  # 心跳间隔秒数
-        last_heartbeat = datetime.utcnow()
+        last_heartbeat = time.monotonic()
 
-        while self.is_active or not self.event_queue.empty():
+        while self.is_active or self.event_queue:
             try:
-                event = self.event_queue.get(timeout=1.0)
-
-                # 检查是否是关闭事件
-                event_meta = event.get('event', {})
-                if event_meta.get('category') == 'system' and event_meta.get('action') == 'close':
-                    yield f"event: close\ndata: {json.dumps({'message': 'Stream closed'}, ensure_ascii=False)}\n\n"
-                    break
-
-                # 格式化 SSE 事件
-                yield from self._format_dict_event(event)
+                frame = self.event_queue.popleft()
+            except IndexError:
+                # 缓冲为空：先清除唤醒标记再等待，清除后到达的帧会重新置位，不会丢失
+                self._wake.clear()
+                if self.event_queue or self._wake.wait(timeout=1.0):
+                    continue
 
-            except Empty:
                 # 发送心跳保持连接
-                now = datetime.utcnow()
-                if (now - last_heartbeat).seconds >= heartbeat_interval:
-                    yield f": heartbeat {now.isoformat()}Z\n\n"
+                now = time.monotonic()
+                if now - last_heartbeat >= heartbeat_interval:
+                    yield f": heartbeat {self._timestamp()}\n\n"
                     last_heartbeat = now
-
-    def _format_dict_event(self, event: Dict) -> Generator[str, None, None]:
-        """格式化字典类型的事件为 SSE 字符串"""
+                continue
+
+            # 合并缓冲中已就绪的后续帧，遇到关闭事件即停止
+            closed = frame is _CLOSE_FRAME
+            if closed or not self.event_queue:
+                yield frame
+            else:
+                batch = [frame]
+                size = len(frame)
+                while len(batch) < _BATCH_MAX_FRAMES and size < _BATCH_MAX_CHARS:
+                    try:
+                        frame = self.event_queue.popleft()
+                    except IndexError:
+                        break
+                    batch.append(frame)
+                    size += len(frame)
+                    if frame is _CLOSE_FRAME:
+                        closed = True
+                        break
+                yield "".join(batch)
+
+            # 检查是否是关闭事件
+            if closed:
+                break
+
+    def _format_dict_event(self, event: Dict) -> str:
+        """格式化字典类型的事件为 SSE 帧字符串"""
         event_meta = event.get('event', {})
         category = event_meta.get('category', 'unknown')
         action = event_meta.get('action', 'unknown')
         event_type = f"{category}.{action}"
 
+        data_line = f"event: {event_type}\ndata: {_dumps(event)}\n\n"
+
         # 输出 id 字段（用于客户端 Last-Event-ID）
         event_id = event.get('id')
         if event_id:
-            yield f"id: {event_id}\n"
+            return f"id: {event_id}\n{data_line}"
+        return data_line
 
-        yield f"event: {event_type}\n"
-        yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
-
-    def _format_stream_event(self, event: StreamEvent) -> Generator[str, None, None]:
-        """格式化 StreamEvent 为 SSE 字符串"""
+    def _format_stream_event(self, event: StreamEvent) -> str:
+        """格式化 StreamEvent 为 SSE 帧字符串"""
         event_type = f"{event.event.get('category', 'unknown')}.{event.event.get('action', 'unknown')}"
 
         # 构建完整事件数据
@@ -194,9 +241,7 @@ class SSEManager:
             'data': event.data
         }
 
-        yield f"id: {event.id}\n"
-        yield f"event: {event_type}\n"
-        yield f"data: {json.dumps(event_data, ensure_ascii=False)}\n\n"
+        return f"id: {event.id}\nevent: {event_type}\ndata: {_dumps(event_data)}\n\n"
 
     def create_response(
         self,
@@ -224,17 +269,27 @@ class SSERegistry:
     """SSE 管理器注册表 - 单例模式"""
 
     _instance: Optional['SSERegistry'] = None
-    _managers: Dict[int, SSEManager] = {}
-    _lock = threading.Lock()
+    # 仅用于保护单例创建
+    _instance_lock = threading.Lock()
+
+    # register/remove 的分段锁数量（须为 2 的幂）
+    _LOCK_STRIPES = 16
 
     def __new__(cls):
         if cls._instance is None:
-            with cls._lock:
+            with cls._instance_lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._managers = {}
+                    instance = super().__new__(cls)
+                    instance._managers: Dict[int, SSEManager] = {}
+                    # 按 run_id 分段加锁：关闭某个运行的管理器不会阻塞其他运行的注册/移除
+                    instance._locks = tuple(threading.Lock() for _ in range(cls._LOCK_STRIPES))
+                    cls._instance = instance
         return cls._instance
 
+    def _lock_for(self, run_id: int) -> threading.Lock:
+        """获取 run_id 对应的分段锁"""
+        return self._locks[hash(run_id) & (self._LOCK_STRIPES - 1)]
+
     @classmethod
     def get_instance(cls) -> 'SSERegistry':
         """获取单例实例"""
@@ -248,9 +303,10 @@ class SSERegistry:
             run_id: 运行 ID
             event_store: EventStore 实例（可选）
         """
-        with self._lock:
-            if run_id in self._managers:
-                self._managers[run_id].close()
+        with self._lock_for(run_id):
+            old_manager = self._managers.pop(run_id, None)
+            if old_manager is not None:
+                old_manager.close()
 
             manager = SSEManager(run_id, event_store=event_store)
             self._managers[run_id] = manager
@@ -262,11 +318,11 @@ class SSERegistry:
 
     def remove(self, run_id: int):
         """移除 SSE 管理器"""
-        with self._lock:
-            if run_id in self._managers:
-                self._managers[run_id].close()
-                del self._managers[run_id]
+        with self._lock_for(run_id):
+            manager = self._managers.pop(run_id, None)
+            if manager is not None:
+                manager.close()
 
     def get_all_run_ids(self) -> list:
         """获取所有活跃的运行 ID"""
-        return list(self._managers.keys())
+        return list(self._managers)
@@ -16,14 +16,80 @@
     python test_stream.py [--hierarchy ID] [--task "任务描述"]
 """
 
-import json
+import sys
+import time
+import orjson
 import requests
 import sseclient
 import argparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # API 基础 URL
 BASE_URL = "http://localhost:8082"
 
+# 复用同一个 Session，所有请求共享 keep-alive 连接池
+SESSION = requests.Session()
+# 连接失败和 502/503/504 由 urllib3 指数退避重试，无需手写 sleep
+_RETRY = Retry(
+    total=4,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+    raise_on_status=False,
+)
+# 非幂等的 POST（创建层级、启动运行）只重试连接失败，避免服务端已受理后重复提交
+_NON_IDEMPOTENT_RETRY = _RETRY.new(allowed_methods=frozenset(['GET', 'HEAD']))
+_NON_IDEMPOTENT_PATHS = (
+    "/api/executor/v1/hierarchies/create",
+    "/api/executor/v1/runs/start",
+)
+
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+# Session 按最长前缀选择 adapter，非幂等接口使用单独的重试策略
+_non_idempotent_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=_NON_IDEMPOTENT_RETRY)
+for _path in _NON_IDEMPOTENT_PATHS:
+    SESSION.mount(f"{BASE_URL}{_path}", _non_idempotent_adapter)
+# 请求体统一由 orjson 序列化后以 data= 发送
+SESSION.headers["Content-Type"] = "application/json"
+
+# 事件流断开后的最大重连次数
+MAX_RECONNECTS = 3
+# 整个事件流的最长等待时间（秒）
+STREAM_TIMEOUT = 300.0
+# 单次读取超时（秒），需大于服务端 15 秒的心跳间隔
+STREAM_READ_TIMEOUT = 60
+
+# 测试用层级团队配置（常量，导入时序列化一次）
+TEST_HIERARCHY_CONFIG = {
+    "name": "测试团队",
+    "description": "流式事件格式测试",
+    "global_supervisor_agent": {
+        "agent_id": "gs-001",
+        "system_prompt": "你是首席科学家，负责协调研究团队。根据任务需求调用合适的团队。"
+    },
+    "teams": [
+        {
+            "name": "研究组",
+            "team_supervisor_agent": {
+                "agent_id": "ts-research-001",
+                "system_prompt": "你是研究组主管，负责协调研究员完成任务。"
+            },
+            "workers": [
+                {
+                    "agent_id": "worker-alice-001",
+                    "name": "Alice",
+                    "role": "研究员",
+                    "system_prompt": "你是 Alice，一名研究员，擅长解释复杂概念。"
+                }
+            ]
+        }
+    ]
+}
+_TEST_HIERARCHY_BYTES = orjson.dumps(TEST_HIERARCHY_CONFIG)
+
 
 class Colors:
     HEADER = '\033[95m'
@@ -36,6 +102,24 @@ class Colors:
     BOLD = '\033[1m'
 
 
+# 标题块分隔线
+_BANNER_SEPARATOR = '=' * 60
+
+# 事件 category 与显示颜色的对应关系
+_CATEGORY_COLORS = {
+    'lifecycle': Colors.GREEN,
+    'llm': Colors.CYAN,
+    'dispatch': Colors.YELLOW,
+    'system': Colors.RED,
+}
+
+
+def print_banner(title: str):
+    """打印带分隔线的标题块（一次写出）"""
+    sys.stdout.write(f"\n{_BANNER_SEPARATOR}\n  {title}\n{_BANNER_SEPARATOR}\n")
+    sys.stdout.flush()
+
+
 def print_event(event_num: int, event_data: dict):
     """打印格式化的事件"""
     source = event_data.get('source')
@@ -46,18 +130,12 @@ def print_event(event_num: int, event_data: dict):
     action = event.get('action', 'unknown')
 
     # 根据 category 选择颜色
-    color = Colors.RESET
-    if category == 'lifecycle':
-        color = Colors.GREEN
-    elif category == 'llm':
-        color = Colors.CYAN
-    elif category == 'dispatch':
-        color = Colors.YELLOW
-    elif category == 'system':
-        color = Colors.RED
-
-    print(f"\n{Colors.BOLD}[EVENT #{event_num}]{Colors.RESET}")
-    print(f"  {color}event: {category}.{action}{Colors.RESET}")
+    color = _CATEGORY_COLORS.get(category, Colors.RESET)
+
+    lines = [
+        f"\n{Colors.BOLD}[EVENT #{event_num}]{Colors.RESET}",
+        f"  {color}event: {category}.{action}{Colors.RESET}",
+    ]
 
     if source:
         agent_type = source.get('agent_type', 'unknown')
@@ -67,51 +145,30 @@ def print_event(event_num: int, event_data: dict):
         source_str = f"{agent_type}: {agent_name}"
         if team_name:
             source_str += f" @ {team_name}"
-        print(f"  source: {source_str}")
+        lines.append(f"  source: {source_str}")
 
     # 打印关键数据
     if 'content' in data:
         content = data['content'][:100]
-        print(f"  content: {content}...")
+        lines.append(f"  content: {content}...")
     elif 'task' in data:
-        print(f"  task: {data['task']}")
+        lines.append(f"  task: {data['task']}")
     elif 'name' in data:
-        print(f"  name: {data['name']}")
+        lines.append(f"  name: {data['name']}")
     elif 'error' in data:
-        print(f"  {Colors.RED}error: {data['error']}{Colors.RESET}")
+        lines.append(f"  {Colors.RED}error: {data['error']}{Colors.RESET}")
+
+    # 整个事件一次写出，避免每行一次 write
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.flush()
 
 
 def create_hierarchy():
     """创建测试用的层级团队"""
-    payload = {
-        "name": "测试团队",
-        "description": "流式事件格式测试",
-        "global_supervisor_agent": {
-            "agent_id": "gs-001",
-            "system_prompt": "你是首席科学家，负责协调研究团队。根据任务需求调用合适的团队。"
-        },
-        "teams": [
-            {
-                "name": "研究组",
-                "team_supervisor_agent": {
-                    "agent_id": "ts-research-001",
-                    "system_prompt": "你是研究组主管，负责协调研究员完成任务。"
-                },
-                "workers": [
-                    {
-                        "agent_id": "worker-alice-001",
-                        "name": "Alice",
-                        "role": "研究员",
-                        "system_prompt": "你是 Alice，一名研究员，擅长解释复杂概念。"
-                    }
-                ]
-            }
-        ]
-    }
-
-    resp = requests.post(f"{BASE_URL}/api/executor/v1/hierarchies/create", json=payload)
+    resp = SESSION.post(f"{BASE_URL}/api/executor/v1/hierarchies/create", data=_TEST_HIERARCHY_BYTES)
     if resp.status_code == 200:
-        result = resp.json()
+        result = orjson.loads(resp.content)
         if result.get('success'):
             return result['data']['id']
     return None
@@ -120,23 +177,29 @@ def create_hierarchy():
 def get_or_create_hierarchy():
     """获取或创建测试层级"""
     # 先尝试获取已存在的
-    resp = requests.post(f"{BASE_URL}/api/executor/v1/hierarchies/list", json={"page": 1, "size": 10})
+    resp = SESSION.post(f"{BASE_URL}/api/executor/v1/hierarchies/list", data=orjson.dumps({"page": 1, "size": 10}))
     if resp.status_code == 200:
-        result = resp.json()
+        result = orjson.loads(resp.content)
         items = result.get('data', {}).get('items', [])
         for item in items:
-            if item.get('name') == '测试团队':
+            if item.get('name') == TEST_HIERARCHY_CONFIG['name']:
                 return item['id']
 
     # 不存在则创建
     return create_hierarchy()
 
 
+def _iter_until(response, deadline: float):
+    """逐块读取响应体（包括心跳帧），到达截止时间后停止"""
+    for chunk in response.iter_content(chunk_size=None):
+        yield chunk
+        if time.monotonic() >= deadline:
+            return
+
+
 def test_stream(hierarchy_id: str, task: str):
     """测试流式事件"""
-    print(f"\n{'='*60}")
-    print(f"  流式事件测试")
-    print(f"{'='*60}")
+    print_banner("流式事件测试")
 
     # 启动运行
     start_payload = {
@@ -147,12 +210,12 @@ def test_stream(hierarchy_id: str, task: str):
     print(f"\n启动任务: {task}")
     print(f"Hierarchy ID: {hierarchy_id}")
 
-    resp = requests.post(f"{BASE_URL}/api/executor/v1/runs/start", json=start_payload)
+    resp = SESSION.post(f"{BASE_URL}/api/executor/v1/runs/start", data=orjson.dumps(start_payload))
     if resp.status_code != 200:
         print(f"启动失败: {resp.text}")
         return
 
-    result = resp.json()
+    result = orjson.loads(resp.content)
     if not result.get('success'):
         print(f"启动失败: {result}")
         return
@@ -161,31 +224,73 @@ def test_stream(hierarchy_id: str, task: str):
     print(f"Run ID: {run_id}")
 
     # 监听事件流
-    print(f"\n{'='*60}")
-    print(f"  开始监听事件流")
-    print(f"{'='*60}")
+    print_banner("开始监听事件流")
 
     stream_url = f"{BASE_URL}/api/executor/v1/runs/stream"
-    stream_resp = requests.post(stream_url, json={"id": run_id}, stream=True)
-
-    client = sseclient.SSEClient(stream_resp)
+    # 请求体只依赖 run_id，重连时复用同一份序列化结果
+    stream_body = orjson.dumps({"id": run_id})
     event_count = 0
-
-    for event in client.events():
-        if event.event == 'close':
-            print(f"\n{Colors.GREEN}[STREAM CLOSED]{Colors.RESET}")
+    # 最后收到的事件 ID，断线重连时通过 Last-Event-ID 只补发之后的事件
+    last_event_id = None
+    closed = False
+    # 使用单调时钟计算截止时间，不受系统时间调整影响
+    deadline = time.monotonic() + STREAM_TIMEOUT
+
+    for _ in range(MAX_RECONNECTS + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        headers = {'Last-Event-ID': last_event_id} if last_event_id else None
+        try:
+            stream_resp = SESSION.post(stream_url, data=stream_body, headers=headers, stream=True,
+                                       timeout=(5, min(STREAM_READ_TIMEOUT, remaining)))
+        except requests.exceptions.RequestException as e:
+            print(f"\n{Colors.RED}[STREAM FAILED] 连接事件流失败: {e}{Colors.RESET}")
+            break
+        if stream_resp.status_code != 200:
+            print(f"事件流不可用: {stream_resp.text}")
             break
 
+        # sseclient 不会产出心跳注释帧，因此在原始数据块层面检查截止时间
+        client = sseclient.SSEClient(_iter_until(stream_resp, deadline))
         try:
-            event_data = json.loads(event.data)
-            event_count += 1
-            print_event(event_count, event_data)
-        except json.JSONDecodeError:
-            print(f"[RAW] {event.data}")
+            for event in client.events():
+                if event.event == 'close':
+                    print(f"\n{Colors.GREEN}[STREAM CLOSED]{Colors.RESET}")
+                    closed = True
+                    break
+
+                if event.id:
+                    last_event_id = event.id
+
+                try:
+                    event_data = orjson.loads(event.data)
+                    event_count += 1
+                    print_event(event_count, event_data)
+                except orjson.JSONDecodeError:
+                    print(f"[RAW] {event.data}")
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            print(f"\n{Colors.YELLOW}[STREAM DISCONNECTED] {e}，从 {last_event_id} 继续{Colors.RESET}")
+            continue
+        finally:
+            stream_resp.close()
+
+        if closed or not last_event_id:
+            break
+
+    if not closed and time.monotonic() >= deadline:
+        print(f"\n{Colors.YELLOW}[STREAM TIMEOUT] 超过 {STREAM_TIMEOUT:.0f} 秒{Colors.RESET}")
+
+    print_banner(f"测试完成，共收到 {event_count} 个事件")
 
-    print(f"\n{'='*60}")
-    print(f"  测试完成，共收到 {event_count} 个事件")
-    print(f"{'='*60}")
+
+def check_server() -> bool:
+    """用 HEAD /health 检查服务是否就绪（只关心状态码，不下载响应体）"""
+    try:
+        resp = SESSION.head(f"{BASE_URL}/health", timeout=(1, 2), allow_redirects=False)
+    except requests.exceptions.RequestException:
+        return False
+    return resp.status_code == 200
 
 
 def main():
@@ -194,6 +299,10 @@ def main():
     parser.add_argument('--task', type=str, default='请用一句话解释人工智能', help='任务描述')
     args = parser.parse_args()
 
+    if not check_server():
+        print(f"服务不可用: {BASE_URL}")
+        return
+
     # 获取或创建层级
     if args.hierarchy:
         hierarchy_id = args.hierarchy
@@ -211,4 +320,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        # 进程结束前主动释放连接池中的空闲连接
+        SESSION.close()
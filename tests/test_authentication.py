@@ -21,8 +21,7 @@ def test_api_key_authentication():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 配置 API Key 认证
     config = setup_config(
@@ -52,8 +51,7 @@ def test_iam_role_authentication():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 配置 IAM Role 认证
     config = setup_config(
@@ -81,8 +79,7 @@ def test_authentication_priority():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 同时设置 API Key 和 IAM Role，API Key 应该优先
     config = setup_config(
@@ -107,8 +104,7 @@ def test_environment_variable_loading():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 设置环境变量
     os.environ['AWS_BEDROCK_API_KEY'] = 'env-test-key'
@@ -143,8 +139,7 @@ def test_iam_role_environment_variable():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 设置环境变量
     os.environ['USE_IAM_ROLE'] = 'true'
@@ -175,8 +170,7 @@ def test_lambda_environment_detection():
     print("=" * 80)
     
     # 重置配置实例
-    Config._instance = None
-    Config._initialized = False
+    Config.reset()
     
     # 模拟 Lambda 环境
     os.environ['AWS_LAMBDA_FUNCTION_NAME'] = 'test-function'
@@ -201,6 +195,38 @@ def test_lambda_environment_detection():
         os.environ.pop('AWS_REGION', None)
 
 
+def test_dotenv_loading():
+    """测试从 .env 文件加载配置（含解析缓存）"""
+    print("\n" + "=" * 80)
+    print("测试 7: 从 .env 文件加载配置")
+    print("=" * 80)
+
+    import tempfile
+
+    # 重置配置实例
+    Config.reset()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env_path = os.path.join(tmp_dir, '.env')
+        with open(env_path, 'w') as f:
+            f.write("# comment\n")
+            f.write("AWS_BEDROCK_API_KEY='dotenv-test-key'\n")
+            f.write('AWS_REGION="eu-central-1"\n')
+
+        config = get_config().load_from_dotenv(env_path)
+        assert config.aws_bedrock_api_key == 'dotenv-test-key', "应该从 .env 加载 API Key"
+        assert config.aws_region == 'eu-central-1', "应该从 .env 加载 Region"
+
+        # 文件内容变化后应重新解析
+        with open(env_path, 'w') as f:
+            f.write("AWS_BEDROCK_API_KEY=dotenv-updated-key-0001\n")
+        config.load_from_dotenv(env_path)
+        assert config.aws_bedrock_api_key == 'dotenv-updated-key-0001', "文件变化后应该重新解析"
+
+    print("✓ .env 文件加载测试通过")
+    print(f"  - API Key: {config.aws_bedrock_api_key[:10]}...")
+
+
 def run_all_tests():
     """运行所有测试"""
     print("\n" + "=" * 80)
@@ -214,6 +240,7 @@ def run_all_tests():
         test_environment_variable_loading()
         test_iam_role_environment_variable()
         test_lambda_environment_detection()
+        test_dotenv_loading()
         
         print("\n" + "=" * 80)
         print("✅ 所有测试通过！")
@@ -224,6 +251,7 @@ def run_all_tests():
         print("  ✓ 认证优先级处理")
         print("  ✓ 环境变量加载")
         print("  ✓ Lambda 环境自动检测")
+        print("  ✓ .env 文件加载")
         print("\n系统已准备好支持灵活的认证机制！")
         
     except AssertionError as e:
@@ -4,19 +4,38 @@
 """
 import re
 
+# 预编译正则，避免每次调用重复查找
+_HAS_ALPHA_RE = re.compile(r'[A-Za-z]')
+_VALID_FUNC_NAME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_-]*$')
+
+
+def _slugify(name: str) -> str:
+    """单次遍历完成小写化、非法字符替换、下划线折叠与首尾下划线去除"""
+    out = []
+    prev_underscore = True  # 初始为 True，丢弃开头的下划线
+    for ch in name.lower():
+        if 'a' <= ch <= 'z' or '0' <= ch <= '9':
+            out.append(ch)
+            prev_underscore = False
+        elif not prev_underscore:
+            out.append('_')
+            prev_underscore = True
+    if out and out[-1] == '_':
+        out.pop()
+    return ''.join(out)
+
+
 def generate_func_name(team_name: str) -> str:
     """模拟 hierarchy_system.py 中的函数名生成逻辑"""
     import hashlib
     
-    # 移除所有非ASCII字符，保留字母、数字、下划线
-    func_name_base = re.sub(r'[^a-zA-Z0-9_]', '_', team_name.lower())
-    # 清理多余的下划线
-    func_name_base = re.sub(r'_+', '_', func_name_base).strip('_')
+    # 移除所有非ASCII字符，保留字母、数字、下划线，并清理多余的下划线
+    func_name_base = _slugify(team_name)
     
     # 如果移除非ASCII后为空（纯中文名称），使用哈希值确保唯一性
-    if not func_name_base or not any(c.isalpha() for c in func_name_base):
+    if not func_name_base or _HAS_ALPHA_RE.search(func_name_base) is None:
         # 使用团队名称的哈希值生成唯一标识
-        name_hash = hashlib.md5(team_name.encode('utf-8')).hexdigest()[:8]
+        name_hash = hashlib.blake2b(team_name.encode('utf-8'), digest_size=4).hexdigest()
         func_name = f'team_{name_hash}'
     else:
         # 确保以字母开头
@@ -54,7 +73,7 @@ def test_function_names():
     for team_name in test_cases:
         func_name = generate_func_name(team_name)
         # 检查是否符合 AWS Bedrock 要求：只包含 [a-zA-Z0-9_-]
-        is_valid = bool(re.match(r'^[a-zA-Z][a-zA-Z0-9_-]*$', func_name))
+        is_valid = _VALID_FUNC_NAME_RE.match(func_name) is not None
         
         # 检查唯一性
         is_unique = func_name not in generated_names.values()
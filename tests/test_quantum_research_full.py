@@ -6,7 +6,9 @@ import os
 import sys
 
 # 添加父目录到路径，以便导入 hierarchy_system
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # 导入配置管理模块
 from src.core.config import setup_config